@@ -0,0 +1 @@
+"""로컬 가짜 TMDB/OpenAI 서버로 앱을 headless 실행하는 벤치마크(python -m bench.run)."""
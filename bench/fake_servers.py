@@ -0,0 +1,266 @@
+"""
+벤치마크용 로컬 가짜 TMDB / OpenAI Responses API 서버.
+
+- FakeTMDB: /3/discover/movie, /3/movie/{id}, /3/movie/{id}/videos
+  (응답 지연, total_pages, N번째 요청마다 429 + Retry-After 설정 가능, 엔드포인트별 호출 수 집계)
+- FakeOpenAI: POST /v1/responses (JSON 응답 또는 stream=true면 SSE 이벤트)
+  structured output 스키마의 movie_id 후보 중 첫 번째를 고른다.
+
+둘 다 데이터는 id로부터 결정적으로 만들어서 실행할 때마다 같은 결과가 나온다.
+"""
+import functools
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+PAGE_SIZE = 20
+
+_WORDS = [
+    "웃음", "코미디", "가족", "우정", "모험", "여행", "사랑", "이별", "추억", "성장",
+    "복수", "추격", "폭발", "액션", "판타지", "마법", "우주", "미래", "괴물", "살인",
+    "미스터리", "음모", "감옥", "탈출", "힐링", "시골", "요리", "음악", "꿈", "기적",
+]
+
+
+def movie_id(with_genres: str, page: int, i: int) -> int:
+    """discover 결과의 영화 id(장르 조합별로 겹치지 않게)."""
+    return (zlib.crc32(with_genres.encode()) % 1000 + 1) * 1_000_000 + page * PAGE_SIZE + i
+
+
+@functools.lru_cache(maxsize=None)  # 서버 쪽 생성 비용이 측정에 섞이지 않도록(반환값은 수정하지 않음)
+def _movie(mid: int) -> Dict[str, Any]:
+    rnd = random.Random(mid)
+    overview = " ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(25, 60))) + "."
+    return {
+        "id": mid,
+        "title": f"Movie {mid}",
+        "overview": overview,
+        "poster_path": f"/p{mid}.jpg",
+        "vote_average": round(rnd.uniform(6.0, 9.0), 1),
+        "vote_count": rnd.randint(200, 20000),
+        "release_date": f"{rnd.randint(1980, 2025)}-0{rnd.randint(1, 9)}-1{rnd.randint(0, 9)}",
+        "popularity": round(rnd.uniform(10, 500), 3),
+        "genre_ids": [35],
+    }
+
+
+def _videos(mid: int) -> Dict[str, Any]:
+    return {"id": mid, "results": [{"site": "YouTube", "type": "Trailer", "key": f"yt{mid}"}]}
+
+
+class _Server:
+    """ThreadingHTTPServer를 데몬 스레드로 띄우고 base_url/호출 수를 제공."""
+
+    handler_class: type = BaseHTTPRequestHandler
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        owner = self
+
+        class Handler(self.handler_class):  # type: ignore[misc, valid-type]
+            server_owner = owner
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name=type(self).__name__, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name: str, total: bool = True) -> int:
+        with self._lock:
+            self.calls[name] += 1
+            if total:
+                self.calls["total"] += 1
+            return self.calls["total"]
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.calls)
+
+    def start(self) -> "_Server":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive(클라이언트 커넥션 풀 재사용)
+    disable_nagle_algorithm = True  # 헤더/본문을 따로 보낼 때 delayed ACK로 요청마다 ~40ms 붙는 것 방지
+    server_owner: Any = None
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+# =========================
+# Fake TMDB
+# =========================
+class _TMDBHandler(_Handler):
+    def do_GET(self) -> None:
+        owner: FakeTMDB = self.server_owner
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path[2:] if url.path.startswith("/3/") else url.path
+        endpoint = re.sub(r"/\d+", "/{id}", path)
+
+        n = owner.count(endpoint)
+        if owner.rate_limit_every and n % owner.rate_limit_every == 0:
+            owner.count("429", total=False)
+            self.send_json(429, {"status_code": 25, "status_message": "rate limited"}, {"Retry-After": "0"})
+            return
+        if owner.latency:
+            time.sleep(owner.latency)
+
+        m = re.fullmatch(r"/movie/(\d+)(/videos)?", path)
+        if path == "/discover/movie":
+            page = int(query.get("page", 1))
+            genres = query.get("with_genres", "")
+            results = [_movie(movie_id(genres, page, i)) for i in range(PAGE_SIZE)] if page <= owner.total_pages else []
+            self.send_json(200, {"page": page, "results": results, "total_pages": owner.total_pages, "total_results": owner.total_pages * PAGE_SIZE})
+        elif m and m.group(2):
+            self.send_json(200, _videos(int(m.group(1))))
+        elif m:
+            mid = int(m.group(1))
+            details = dict(_movie(mid), runtime=90 + mid % 60)
+            if "videos" in query.get("append_to_response", ""):
+                details["videos"] = _videos(mid)
+            self.send_json(200, details)
+        else:
+            self.send_json(404, {"status_code": 34, "status_message": "not found"})
+
+
+class FakeTMDB(_Server):
+    handler_class = _TMDBHandler
+
+    def __init__(self, latency: float = 0.02, total_pages: int = 500, rate_limit_every: int = 0, **kwargs: Any):
+        super().__init__(latency=latency, **kwargs)
+        self.total_pages = total_pages
+        self.rate_limit_every = rate_limit_every  # 0이면 429 없음
+
+    @property
+    def base_url(self) -> str:
+        return super().base_url + "/3"
+
+
+# =========================
+# Fake OpenAI Responses API
+# =========================
+def _response_obj(model: str, text: str, input_tokens: int, output_tokens: int) -> Dict[str, Any]:
+    return {
+        "id": "resp_bench",
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": model,
+        "status": "completed",
+        "output": [
+            {
+                "type": "message",
+                "id": "msg_bench",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+class _OpenAIHandler(_Handler):
+    def do_POST(self) -> None:
+        owner: FakeOpenAI = self.server_owner
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if not self.path.rstrip("/").endswith("/responses"):
+            self.send_json(404, {"error": {"message": "not found"}})
+            return
+        stream = bool(body.get("stream"))
+        owner.count("responses.stream" if stream else "responses")
+
+        text, input_tokens = owner.answer(body)
+        chunks = [text[i:i + owner.chunk_chars] for i in range(0, len(text), owner.chunk_chars)]
+        response = _response_obj(body.get("model", "fake"), text, input_tokens, len(chunks))
+        time.sleep(owner.latency)  # 첫 토큰까지
+
+        if not stream:
+            time.sleep(owner.chunk_delay * len(chunks))
+            self.send_json(200, response)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        seq = 0
+        events: List[Tuple[str, Dict[str, Any]]] = [("response.created", {"response": dict(response, status="in_progress", output=[])})]
+        events += [
+            ("response.output_text.delta", {"item_id": "msg_bench", "output_index": 0, "content_index": 0, "delta": c, "logprobs": []})
+            for c in chunks
+        ]
+        events.append(("response.completed", {"response": response}))
+        for event_type, payload in events:
+            payload = dict(payload, type=event_type, sequence_number=seq)
+            seq += 1
+            self.wfile.write(f"event: {event_type}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if event_type == "response.output_text.delta":
+                time.sleep(owner.chunk_delay)
+
+
+class FakeOpenAI(_Server):
+    handler_class = _OpenAIHandler
+
+    def __init__(self, latency: float = 0.2, chunk_delay: float = 0.005, chunk_chars: int = 6, **kwargs: Any):
+        super().__init__(latency=latency, **kwargs)
+        self.chunk_delay = chunk_delay
+        self.chunk_chars = chunk_chars
+
+    @property
+    def base_url(self) -> str:
+        return super().base_url + "/v1"
+
+    @staticmethod
+    def answer(body: Dict[str, Any]) -> Tuple[str, int]:
+        """스키마의 movie_id 후보 중 첫 번째를 고른 JSON 텍스트와 (대략의) 입력 토큰 수."""
+        schema = (((body.get("text") or {}).get("format") or {}).get("schema") or {})
+        ids = ((schema.get("properties") or {}).get("movie_id") or {}).get("enum") or [0]
+        prompt = "".join(str(m.get("content", "")) for m in body.get("input") or [] if isinstance(m, dict))
+        text = json.dumps(
+            {"movie_id": ids[0], "title": f"Movie {ids[0]}", "reason": "지금 기분에 맞게 가볍게 웃으면서 쉬어 갈 수 있는 영화라서 골랐어요."},
+            ensure_ascii=False,
+        )
+        return text, max(1, len(prompt) // 3)
@@ -0,0 +1,306 @@
+"""
+API 키/네트워크 없이 앱 성능을 재는 벤치마크.
+
+로컬 가짜 TMDB/OpenAI 서버(bench.fake_servers)를 띄우고 Streamlit AppTest로 app.py를
+headless 실행한다. 시나리오별 p50/p95 지연(ms), 반복당 HTTP 호출 수, 최대 메모리(tracemalloc)를
+재서 bench/baseline.json과 비교하고, 허용 범위를 넘으면 exit 1. 메모리는 tracemalloc 오버헤드가
+지연에 섞이지 않도록 시나리오마다 한 번 따로 돌려서 잰다.
+
+    python -m bench.run                          # 측정 + 기준값 비교
+    python -m bench.run --update-baseline        # 지금 수치를 기준값으로 저장
+    python -m bench.run --tmdb-latency 0.05 --tmdb-429-every 20 --iterations 20
+
+시나리오:
+    fetch_cold        캐시를 비운 새 세션에서 '후보 가져오기'
+    fetch_warm        캐시가 찬 상태에서 새 세션의 '후보 가져오기'
+    reroll_excluded   앞쪽 여러 페이지 + 무관한 id 수천 개를 제외 목록에 넣고 '다시 뽑기'(캐시 비운 상태)
+    final_pick        LLM(스트리밍) 최종 추천(추천 결과 캐시는 매번 비움)
+    checkbox_full_rerun  카드의 '이미 봤어요' 체크/해제. AppTest는 fragment rerun을 지원하지 않아
+                         스크립트 전체 rerun으로 잰다(실제 앱의 카드 fragment rerun보다 느린 상한값)
+
+지연 기준값은 측정한 기계에 따라 다르므로 다른 환경에서는 --update-baseline으로 다시 잡는다.
+TMDB 요청 속도 제한(TMDB_RATE_LIMIT)은 따로 지정하지 않으면 꺼서 앱 자체만 잰다.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+BASELINE_PATH = os.path.join(ROOT, "bench", "baseline.json")
+DEFAULT_OUT = os.path.join(ROOT, "bench_output.txt")
+
+SITUATION = "과제 때문에 머리가 터질 것 같고 지쳐요. 아무 생각 없이 웃고 싶어요."
+FETCH_LABEL = "후보 가져오기"
+REROLL_LABEL = "다시 뽑기"
+FINAL_LABEL = "최종 추천"
+
+# 회귀 판정: value > baseline * ratio + slack 이면 실패(--tolerance로 ratio를 배율 조정)
+THRESHOLDS = {
+    "p50_ms": (1.5, 5.0),
+    "p95_ms": (1.75, 10.0),
+    "http_calls": (1.0, 1.0),  # 백그라운드 선읽기가 측정 구간 경계에 걸리는 경우 대비
+    "peak_mb": (1.3, 1.0),
+}
+
+
+# =========================
+# App driver
+# =========================
+class Bench:
+    def __init__(self, tmdb: Any, openai: Any, excluded_pages: int, excluded_extra: int):
+        self.tmdb = tmdb
+        self.openai = openai
+        self.excluded_pages = excluded_pages
+        self.excluded_extra = excluded_extra
+
+    def http_calls(self) -> int:
+        return self.tmdb.snapshot().get("total", 0) + self.openai.snapshot().get("total", 0)
+
+    def session(self, with_openai: bool = False):
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(APP_PATH, default_timeout=120).run()
+        at.sidebar.text_input[0].input("bench-tmdb-key")
+        if with_openai:
+            at.sidebar.text_input[1].input("sk-bench")
+        at.text_area[0].input(SITUATION)
+        return self.run(at)
+
+    @staticmethod
+    def run(at):
+        at.run()
+        if at.exception:
+            raise RuntimeError(f"app raised: {[e.message for e in at.exception]}")
+        return at
+
+    def click(self, at, label: str):
+        button = next(b for b in at.button if label in b.label)
+        button.click()
+        return self.run(at)
+
+    def set_checkbox(self, at, value: bool):
+        at.checkbox[0].set_value(value)
+        return self.run(at)
+
+    @staticmethod
+    def reset_caches() -> None:
+        from reco.candidate_store import CANDIDATE_STORE
+        from reco.llm_cache import PICK_CACHE
+        from reco.tmdb_cache import get_cache
+
+        get_cache().clear()
+        CANDIDATE_STORE.clear()
+        PICK_CACHE.clear()
+
+    def excluded_ids(self, at) -> set:
+        # 화면의 후보 + 같은 장르 조합의 앞쪽 excluded_pages 페이지 + 카탈로그에 없는 id 여러 개
+        from bench.fake_servers import PAGE_SIZE, movie_id
+        from reco.mood import classify_mood
+
+        _, genre_ids, _ = classify_mood(SITUATION, "자동 분류")
+        genres = ",".join(str(g) for g in genre_ids)
+        ids = set(at.session_state["candidate_ids"])
+        ids |= {movie_id(genres, p, i) for p in range(1, self.excluded_pages + 1) for i in range(PAGE_SIZE)}
+        ids |= set(range(1, self.excluded_extra + 1))
+        return ids
+
+    # 각 시나리오: 준비는 재지 않고 measure(fn) 구간만 잼
+    def fetch_cold(self, measure: Callable) -> None:
+        self.reset_caches()
+        at = self.session()
+        measure(lambda: self.click(at, FETCH_LABEL))
+
+    def fetch_warm(self, measure: Callable) -> None:
+        at = self.session()
+        measure(lambda: self.click(at, FETCH_LABEL))
+
+    def reroll_excluded(self, measure: Callable) -> None:
+        self.reset_caches()  # 제외된 페이지를 넘기며 이어받는 비용을 매번 재도록
+        at = self.session()
+        self.click(at, FETCH_LABEL)
+        at.session_state["excluded_ids"] = self.excluded_ids(at)
+        measure(lambda: self.click(at, REROLL_LABEL))
+
+    def final_pick(self, measure: Callable) -> None:
+        from reco.llm_cache import PICK_CACHE
+
+        at = self.session(with_openai=True)
+        self.click(at, FETCH_LABEL)
+        PICK_CACHE.clear()
+        measure(lambda: self.click(at, FINAL_LABEL))
+
+    def checkbox_full_rerun(self, measure: Callable) -> None:
+        # AppTest는 위젯이 fragment 안에 있어도 app.py 전체를 다시 실행한다.
+        # 그래서 render.card만이 아니라 classify 등 rerun 전체 비용이 들어감(네트워크 호출은 0이어야 함)
+        at = self.session()
+        self.click(at, FETCH_LABEL)
+        measure(lambda: self.set_checkbox(at, True))
+        measure(lambda: self.set_checkbox(at, False))
+
+
+SCENARIOS = ["fetch_cold", "fetch_warm", "reroll_excluded", "final_pick", "checkbox_full_rerun"]
+
+
+def _percentile(xs: List[float], q: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(q * (len(xs) - 1))))]
+
+
+def run_scenario(bench: Bench, name: str, iterations: int, warmup: int, track_memory: bool) -> Dict[str, Any]:
+    timings: List[float] = []
+    http_calls = 0
+    measuring = False
+
+    def measure(fn: Callable) -> None:
+        nonlocal http_calls
+        before = bench.http_calls()
+        t0 = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - t0) * 1000
+        if measuring:
+            timings.append(elapsed)
+            http_calls += bench.http_calls() - before
+
+    scenario = getattr(bench, name)
+    for _ in range(warmup):
+        scenario(measure)
+    measuring = True
+    for _ in range(iterations):
+        scenario(measure)
+
+    result = {
+        "p50_ms": round(statistics.median(timings), 1),
+        "p95_ms": round(_percentile(timings, 0.95), 1),
+        "http_calls": round(http_calls / iterations, 2),
+        "samples": len(timings),
+    }
+    if track_memory:
+        # tracemalloc은 실행을 몇 배 느리게 하므로 지연 측정과 따로 한 번 더 돌림
+        tracemalloc.start()
+        try:
+            scenario(lambda fn: fn())
+            result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+# =========================
+# Baseline comparison
+# =========================
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    failures = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric, (ratio, slack) in THRESHOLDS.items():
+            if metric not in metrics or metric not in base:
+                continue
+            limit = base[metric] * (1 + (ratio - 1) * tolerance) + slack
+            if metrics[metric] > limit:
+                failures.append(f"{name}.{metric}: {metrics[metric]} > {limit:.2f} (baseline {base[metric]})")
+    return failures
+
+
+def format_table(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> str:
+    cols = ["p50_ms", "p95_ms", "http_calls", "peak_mb"]
+    lines = [f"{'scenario':<18}" + "".join(f"{c:>22}" for c in cols)]
+    for name, metrics in results.items():
+        row = f"{name:<18}"
+        for c in cols:
+            value = metrics.get(c)
+            base = (baseline.get(name) or {}).get(c)
+            cell = "-" if value is None else f"{value:g}"
+            if value is not None and base:
+                cell += f" ({(value - base) / base * 100:+.0f}%)"
+            row += f"{cell:>22}"
+        lines.append(row)
+    return "\n".join(lines)
+
+
+# =========================
+# CLI
+# =========================
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.run", description="로컬 가짜 TMDB/OpenAI로 앱 벤치마크")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="일부만 실행(여러 번 지정 가능)")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--tmdb-latency", type=float, default=0.02, help="TMDB 응답 지연(초)")
+    parser.add_argument("--tmdb-pages", type=int, default=500, help="discover total_pages")
+    parser.add_argument("--tmdb-429-every", type=int, default=0, help="N번째 요청마다 429(0이면 없음)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="첫 토큰까지 지연(초)")
+    parser.add_argument("--llm-chunk-delay", type=float, default=0.005, help="스트리밍 청크 간격(초)")
+    parser.add_argument("--excluded-pages", type=int, default=10, help="reroll_excluded에서 제외할 앞쪽 페이지 수")
+    parser.add_argument("--excluded-extra", type=int, default=5000, help="reroll_excluded에 더할 무관한 id 수")
+    parser.add_argument("--no-memory", action="store_true", help="메모리 측정(tracemalloc 1회 추가 실행) 생략")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=1.0, help="허용 배율 조정(2.0이면 허용폭 두 배)")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    from bench.fake_servers import FakeOpenAI, FakeTMDB
+
+    tmdb = FakeTMDB(latency=args.tmdb_latency, total_pages=args.tmdb_pages, rate_limit_every=args.tmdb_429_every).start()
+    openai = FakeOpenAI(latency=args.llm_latency, chunk_delay=args.llm_chunk_delay).start()
+    workdir = tempfile.mkdtemp(prefix="reco-bench-")
+
+    # reco 모듈이 처음 import/초기화되기 전에 설정(클라이언트/캐시는 프로세스 싱글턴)
+    os.environ.update(
+        TMDB_BASE_URL=tmdb.base_url,
+        OPENAI_BASE_URL=openai.base_url,
+        TMDB_CACHE_PATH=os.path.join(workdir, "tmdb_cache.sqlite3"),
+        MOVIE_CATALOG_DIR=os.path.join(workdir, "catalog"),
+    )
+    os.environ.setdefault("TMDB_RATE_LIMIT", "0")
+    for name in ("TMDB_API_KEY", "RECO_METRICS_FILE", "RECO_METRICS_PORT"):
+        os.environ.pop(name, None)  # 캐시 워머/지표 내보내기는 끔
+    sys.path.insert(0, ROOT)
+
+    track_memory = not args.no_memory
+    bench = Bench(tmdb, openai, args.excluded_pages, args.excluded_extra)
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        for name in args.scenario or SCENARIOS:
+            results[name] = run_scenario(bench, name, args.iterations, args.warmup, track_memory)
+            print(f"{name}: {results[name]}", file=sys.stderr)
+    finally:
+        tmdb.stop()
+        openai.stop()
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(format_table(results, baseline))
+    report = {"settings": {k: v for k, v in vars(args).items() if k not in ("baseline", "out", "update_baseline")}, "results": results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.update_baseline:
+        merged = dict(baseline, **{name: {k: v for k, v in m.items() if k != "samples"} for name, m in results.items()})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(merged, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"baseline updated → {args.baseline}")
+        return 0
+
+    failures = compare(results, baseline, args.tolerance)
+    for line in failures:
+        print(f"REGRESSION {line}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
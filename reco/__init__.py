@@ -0,0 +1 @@
+"""상황 맞춤 영화 추천 앱의 UI 외 로직(프로세스 단위로 공유되는 클라이언트/캐시 등)."""
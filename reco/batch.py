@@ -0,0 +1,377 @@
+"""
+헤드리스 배치 추천(오프라인 평가 / 자주 쓰는 무드의 추천 미리 생성).
+
+    # 상황 JSONL → 추천 결과 JSONL (중단돼도 같은 명령을 다시 실행하면 끝난 줄 다음부터 이어서,
+    # TMDB 장애 등으로 error가 난 줄이 있으면 그 줄부터 다시)
+    python -m reco.batch run situations.jsonl --out results.jsonl --workers 8 --llm-workers 4
+    # 무드 분류만(TMDB/LLM 호출 없음). 입력에 expected_mood가 있으면 일치율도 출력
+    python -m reco.batch classify logged.jsonl --out moods.jsonl
+
+입력 한 줄은 JSON 객체(또는 상황 문자열 하나):
+    {"id": ..., "situation": "...", "mood": "자동 분류", "language": "ko-KR", "region": "KR",
+     "min_vote_count": 200, "min_rating": 6.0, "need": 9, "excluded_ids": [...]}
+situation 외에는 생략 가능(명령행 기본값 사용). 출력은 입력 순서 그대로 한 줄씩 쓰고,
+입력 줄 번호("index")와 입력의 "id"를 같이 담는다.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from reco.catalog_index import get_catalog
+from reco.llm_cache import PICK_CACHE, pick_cache_key
+from reco.mood import AUTO_MOOD, MOOD_GENRES, classify_many, classify_mood
+from reco.perf_metrics import start_exporter
+from reco.pipeline import fetch_candidates, llm_pick_one_movie, prefetch_movie_extras
+from reco.ranking import local_pick
+
+CLASSIFY_CHUNK = 5000
+
+
+class InvalidItem(ValueError):
+    """입력 줄 자체가 잘못됨(다시 실행해도 같은 결과라 resume 때 재시도하지 않음)."""
+
+
+class BatchSettings(NamedTuple):
+    """입력 줄에 값이 없을 때 쓰는 기본값 + 실행 옵션."""
+
+    tmdb_key: str
+    openai_key: str = ""
+    language: str = "ko-KR"
+    region: str = "KR"
+    min_vote_count: int = 200
+    min_rating: float = 6.0
+    need: int = 9
+    workers: int = 8
+    llm_workers: int = 4
+    extras: bool = False  # 후보별 상세/예고편(trailer_url, runtime)까지 붙일지
+    include_candidates: bool = False  # 출력에 후보 레코드 전체를 넣을지(기본은 id만)
+
+
+# =========================
+# JSONL in/out (resume)
+# =========================
+def read_items(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            yield obj if isinstance(obj, dict) else {"situation": str(obj)}
+
+
+def resume_offset(out_path: str) -> int:
+    """
+    이미 써 둔 출력의 다음 입력 번호. 출력은 입력 순서대로 쓰므로 마지막 완성 줄의 index + 1.
+    중간에 끊겨 반쯤 써진 마지막 줄은 잘라 낸다. 재시도할 수 있는 error 줄(일시적 장애)은
+    끝난 걸로 치지 않고 그 줄부터 잘라 내서 다시 실행한다(출력은 계속 입력 순서).
+    """
+    if not os.path.exists(out_path):
+        return 0
+    next_index = 0
+    good_end = 0
+    with open(out_path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+                index = int(record["index"])
+            except (ValueError, KeyError, TypeError):
+                break
+            if "error" in record and record.get("retryable", True):
+                next_index = index
+                break
+            next_index = index + 1
+            good_end = f.tell()
+    if good_end != os.path.getsize(out_path):
+        with open(out_path, "r+b") as f:
+            f.truncate(good_end)
+    return next_index
+
+
+def _enumerate_from(items: Iterable[Dict[str, Any]], start: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    for i, item in enumerate(items):
+        if i >= start:
+            yield i, item
+
+
+def _write(f, record: Dict[str, Any]) -> None:
+    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    f.flush()
+
+
+# =========================
+# LLM picks (deduped, bounded)
+# =========================
+class PickBatcher:
+    """
+    최종 추천 요청을 제한된 풀에서 실행. 같은 (상황, 무드, 후보 집합, 언어)는 진행 중인
+    요청을 같이 기다리고, 끝난 것은 PICK_CACHE에서 바로 나오므로 LLM은 한 번만 호출된다.
+    """
+
+    def __init__(self, openai_key: str, workers: int):
+        self.openai_key = openai_key
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch-llm")
+        self._inflight: Dict[Any, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requested": 0, "deduped": 0}
+
+    def submit(self, situation: str, mood_label: str, candidates: List[Any], language: str) -> Future:
+        key = pick_cache_key(situation, mood_label, [m.id for m in candidates], language)
+        with self._lock:
+            self.stats["requested"] += 1
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.stats["deduped"] += 1
+                return fut
+            fut = self._executor.submit(
+                llm_pick_one_movie,
+                openai_api_key=self.openai_key,
+                situation_text=situation,
+                mood_label=mood_label,
+                candidates=candidates,
+                language=language,
+            )
+            self._inflight[key] = fut
+        fut.add_done_callback(lambda _: self._forget(key))
+        return fut
+
+    def _forget(self, key: Any) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+# =========================
+# Batch run
+# =========================
+def _check_mood(mood: str) -> str:
+    if mood != AUTO_MOOD and mood not in MOOD_GENRES:
+        raise InvalidItem(f"알 수 없는 무드: {mood!r}")
+    return mood
+
+
+def _error_record(index: int, item: Dict[str, Any], e: Exception) -> Dict[str, Any]:
+    record = {"index": index, "id": item.get("id"), "error": f"{type(e).__name__}: {e}"}
+    if isinstance(e, InvalidItem):
+        record["retryable"] = False  # 입력 오류는 resume 때 다시 돌려도 같으므로 건너뜀
+    return record
+
+
+def _prepare(index: int, item: Dict[str, Any], settings: BatchSettings, picker: Optional[PickBatcher]) -> Tuple[Dict[str, Any], Any]:
+    """분류 + 후보 수집(+상세). 반환: (출력 레코드, 최종 추천 Future 또는 dict)."""
+    situation = (item.get("situation") or "").strip()
+    language = item.get("language") or settings.language
+    mood = _check_mood(item.get("mood") or AUTO_MOOD)
+    mood_label, genre_ids, mood_reason = classify_mood(situation, mood)
+
+    candidates = fetch_candidates(
+        api_key=settings.tmdb_key,
+        genre_ids=genre_ids,
+        language=language,
+        region=item.get("region") or settings.region,
+        min_vote_count=int(item.get("min_vote_count", settings.min_vote_count)),
+        min_rating=float(item.get("min_rating", settings.min_rating)),
+        need=int(item.get("need", settings.need)),
+        excluded_ids=set(item.get("excluded_ids") or ()),
+        catalog=get_catalog(language),
+    )
+    if settings.extras:
+        prefetch_movie_extras(settings.tmdb_key, candidates, language)
+
+    record = {
+        "index": index,
+        "id": item.get("id"),
+        "situation": situation,
+        "mood": mood_label,
+        "genre_ids": genre_ids,
+        "mood_reason": mood_reason,
+        "candidate_ids": [m.id for m in candidates],
+    }
+    if settings.include_candidates:
+        record["candidates"] = [m.to_dict() for m in candidates]
+
+    if not candidates:
+        return record, None
+    if picker is None:
+        return record, local_pick(situation, mood_label, candidates)
+    return record, picker.submit(situation, mood_label, candidates, language)
+
+
+def run_batch(items: Iterable[Dict[str, Any]], out_path: str, settings: BatchSettings) -> Dict[str, Any]:
+    """
+    items를 out_path(JSONL)로 추천. 이미 있는 출력은 이어서 쓰고(resume), 결과는 입력 순서대로.
+    동시에 진행하는 항목 수는 workers의 몇 배로 제한해 메모리가 입력 크기와 무관하게 유지된다.
+    """
+    start = resume_offset(out_path)
+    picker = PickBatcher(settings.openai_key, settings.llm_workers) if settings.openai_key else None
+    window = max(1, settings.workers) * 4
+    counts = Counter()
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, settings.workers), thread_name_prefix="batch") as ex, open(
+        out_path, "a", encoding="utf-8"
+    ) as out:
+        pending: Deque[Tuple[int, Dict[str, Any], Future]] = deque()
+
+        def drain_one() -> None:
+            index, item, fut = pending.popleft()
+            try:
+                record, pick = fut.result()
+                if isinstance(pick, Future):
+                    pick = pick.result()
+                record["pick"] = pick
+                counts["picked" if pick else "empty"] += 1
+                if pick and "usage" not in pick and not pick.get("cached"):
+                    counts["local_pick"] += 1
+            except Exception as e:
+                record = _error_record(index, item, e)
+                counts["error"] += 1
+            _write(out, record)
+            counts["written"] += 1
+
+        for index, item in _enumerate_from(items, start):
+            pending.append((index, item, ex.submit(_prepare, index, item, settings, picker)))
+            if len(pending) >= window:
+                drain_one()
+        while pending:
+            drain_one()
+
+    if picker is not None:
+        picker.shutdown()
+    report = {
+        "resumed_from": start,
+        "seconds": round(time.perf_counter() - t0, 2),
+        **counts,
+    }
+    if picker is not None:
+        report["llm"] = dict(picker.stats, cache=PICK_CACHE.stats())
+    return report
+
+
+# =========================
+# Classify only
+# =========================
+def classify_batch(items: Iterable[Dict[str, Any]], out_path: str, chunk_size: int = CLASSIFY_CHUNK) -> Dict[str, Any]:
+    """무드 분류만 chunk 단위로(classify_many). expected_mood가 있는 줄은 일치율을 집계."""
+    start = resume_offset(out_path)
+    counts = Counter()
+    confusion = Counter()
+
+    def flush(chunk: List[Tuple[int, Dict[str, Any]]], out) -> None:
+        # fallback(직접 선택 무드)별로 묶어서 classify_many
+        by_fallback: Dict[str, List[int]] = {}
+        for pos, (_, item) in enumerate(chunk):
+            by_fallback.setdefault(item.get("mood") or AUTO_MOOD, []).append(pos)
+        results: List[Any] = [None] * len(chunk)
+        for fallback, positions in by_fallback.items():
+            try:
+                _check_mood(fallback)
+            except InvalidItem as e:
+                # 알 수 없는 무드는 그 줄만 error로 기록(run과 같은 형식)
+                for p in positions:
+                    results[p] = e
+                continue
+            texts = [chunk[p][1].get("situation") or "" for p in positions]
+            for p, res in zip(positions, classify_many(texts, fallback)):
+                results[p] = res
+        for (index, item), res in zip(chunk, results):
+            counts["written"] += 1
+            if isinstance(res, Exception):
+                counts["error"] += 1
+                _write(out, _error_record(index, item, res))
+                continue
+            mood, genre_ids, _reason = res
+            record = {"index": index, "id": item.get("id"), "mood": mood, "genre_ids": genre_ids}
+            expected = item.get("expected_mood")
+            if expected:
+                record["expected_mood"] = expected
+                counts["labeled"] += 1
+                counts["agree"] += mood == expected
+                if mood != expected:
+                    confusion[(expected, mood)] += 1
+            _write(out, record)
+
+    with open(out_path, "a", encoding="utf-8") as out:
+        chunk: List[Tuple[int, Dict[str, Any]]] = []
+        for index, item in _enumerate_from(items, start):
+            chunk.append((index, item))
+            if len(chunk) >= chunk_size:
+                flush(chunk, out)
+                chunk = []
+        if chunk:
+            flush(chunk, out)
+
+    report: Dict[str, Any] = {"resumed_from": start, **counts}
+    if counts["labeled"]:
+        report["accuracy"] = round(counts["agree"] / counts["labeled"], 4)
+        report["top_confusions"] = [
+            {"expected": e, "got": g, "count": n} for (e, g), n in confusion.most_common(10)
+        ]
+    return report
+
+
+# =========================
+# CLI
+# =========================
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m reco.batch", description="상황 JSONL 배치 추천/무드 분류")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="분류 → 후보 수집 → 최종 1편 추천")
+    p_run.add_argument("input")
+    p_run.add_argument("--out", required=True)
+    p_run.add_argument("--tmdb-key", default=os.environ.get("TMDB_API_KEY"))
+    p_run.add_argument("--openai-key", default=os.environ.get("OPENAI_API_KEY", ""), help="없으면 로컬 랭킹으로 1편")
+    p_run.add_argument("--language", default="ko-KR")
+    p_run.add_argument("--region", default="KR")
+    p_run.add_argument("--min-vote-count", type=int, default=200)
+    p_run.add_argument("--min-rating", type=float, default=6.0)
+    p_run.add_argument("--need", type=int, default=9)
+    p_run.add_argument("--workers", type=int, default=8, help="동시에 분류/후보 수집할 항목 수")
+    p_run.add_argument("--llm-workers", type=int, default=4, help="동시 LLM 호출 수")
+    p_run.add_argument("--extras", action="store_true", help="후보별 상세/예고편도 가져옴")
+    p_run.add_argument("--include-candidates", action="store_true", help="출력에 후보 레코드 전체 포함")
+
+    p_cls = sub.add_parser("classify", help="무드 분류만(네트워크 X)")
+    p_cls.add_argument("input")
+    p_cls.add_argument("--out", required=True)
+    p_cls.add_argument("--chunk-size", type=int, default=CLASSIFY_CHUNK)
+
+    args = parser.parse_args(argv)
+    # RECO_METRICS_FILE이 있으면 끝날 때 지표를 파일로 남김(reco.perf_metrics)
+    start_exporter()
+    if args.command == "run":
+        if not args.tmdb_key:
+            parser.error("--tmdb-key 또는 TMDB_API_KEY가 필요합니다.")
+        settings = BatchSettings(
+            tmdb_key=args.tmdb_key,
+            openai_key=args.openai_key,
+            language=args.language,
+            region=args.region,
+            min_vote_count=args.min_vote_count,
+            min_rating=args.min_rating,
+            need=args.need,
+            workers=args.workers,
+            llm_workers=args.llm_workers,
+            extras=args.extras,
+            include_candidates=args.include_candidates,
+        )
+        report = run_batch(read_items(args.input), args.out, settings)
+    else:
+        report = classify_batch(read_items(args.input), args.out, args.chunk_size)
+    print(json.dumps(report, ensure_ascii=False), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+discover 캐시 워머.
+
+무드별 장르 조합 × 언어 × 지역의 앞쪽 페이지를 시작할 때와 주기적으로 미리 받아,
+TTL이 끝나기 전에 갱신해 둔다. 여러 워커 프로세스가 각자 돌아도 디스크 캐시의
+남은 TTL을 보고 필요한 것만 갱신하므로 중복 호출은 거의 없다.
+"""
+import os
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+from reco.mood import MOOD_GENRES
+from reco.tmdb_api import DISCOVER_TTL, discover_movies_cached
+
+Combo = Tuple[str, str, str, int, float]  # (with_genres, language, region, min_vote_count, min_rating)
+
+
+def discover_combinations(
+    languages: Iterable[str],
+    regions: Iterable[str],
+    min_vote_count: int,
+    min_rating: float,
+) -> List[Combo]:
+    genre_sets = []
+    for genres in MOOD_GENRES.values():
+        csv = ",".join(str(g) for g in genres)
+        if csv not in genre_sets:
+            genre_sets.append(csv)
+    return [(g, lang, reg, min_vote_count, min_rating) for g in genre_sets for lang in languages for reg in regions]
+
+
+class CacheWarmer(threading.Thread):
+    def __init__(self, api_key: str, combos: List[Combo], pages: int = 2, interval: float = 5 * 60, margin: Optional[float] = None):
+        super().__init__(name="discover-warmer", daemon=True)
+        self.api_key = api_key
+        self.combos = combos
+        self.pages = pages
+        self.interval = interval
+        # 남은 TTL이 이보다 짧으면 갱신(다음 주기 전에 만료되지 않도록 interval보다 길게)
+        self.margin = margin if margin is not None else min(DISCOVER_TTL / 2, interval * 2)
+        self._stop_event = threading.Event()
+
+    def warm_once(self) -> int:
+        refreshed = 0
+        for combo in self.combos:
+            for page in range(1, self.pages + 1):
+                if self._stop_event.is_set():
+                    return refreshed
+                remaining = discover_movies_cached.ttl_remaining(self.api_key, *combo, page)
+                if remaining is not None and remaining > self.margin:
+                    continue
+                try:
+                    discover_movies_cached.refresh(self.api_key, *combo, page)
+                    refreshed += 1
+                except Exception:
+                    continue
+        return refreshed
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            self.warm_once()
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+_warmer: Optional[CacheWarmer] = None
+_warmer_lock = threading.Lock()
+
+
+def start_warmer(
+    api_key: str,
+    languages: Iterable[str],
+    regions: Iterable[str],
+    min_vote_count: int,
+    min_rating: float,
+) -> CacheWarmer:
+    """프로세스당 한 번만 시작(이미 돌고 있으면 그대로 반환). TMDB_WARM_PAGES, TMDB_WARM_INTERVAL로 조정."""
+    global _warmer
+    with _warmer_lock:
+        if _warmer is None or not _warmer.is_alive():
+            _warmer = CacheWarmer(
+                api_key,
+                discover_combinations(languages, regions, min_vote_count, min_rating),
+                pages=int(os.environ.get("TMDB_WARM_PAGES", 2)),
+                interval=float(os.environ.get("TMDB_WARM_INTERVAL", 5 * 60)),
+            )
+            _warmer.start()
+        return _warmer
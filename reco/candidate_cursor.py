@@ -0,0 +1,127 @@
+"""
+쿼리(장르/언어/지역/필터)별로 이어받을 수 있는 discover 후보 스트림.
+
+지금까지 받은 영화를 페이지 순서대로 쌓아 두고, 제외 목록이 늘어 모자랄 때만
+다음 페이지부터 이어서 가져온다. 한 번 모자란 게 확인되면(제외가 많음) workers개씩 동시에
+요청하고, take 한 번에 pages_per_take 페이지까지만 받는다(나머지는 다음 다시 뽑기에서 이어받음).
+TMDB의 total_pages에서 멈추며, 필요하면 다음 페이지를 백그라운드로 미리 받아 둔다.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from reco.perf_metrics import in_context
+
+# TMDB discover는 500페이지까지만 제공
+TMDB_MAX_PAGES = 500
+PAGE_SIZE = 20
+# take 한 번에 받을 최대 페이지 수(workers=3이면 1+3+3+3+3+2, 왕복 6번까지)
+MAX_PAGES_PER_TAKE = 15
+
+FetchPage = Callable[[int], Dict[str, Any]]
+
+# 페이지 요청/선읽기는 프로세스 공용 풀에서
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="discover")
+
+
+class CandidateCursor:
+    def __init__(
+        self,
+        workers: int = 3,
+        prefetch: bool = True,
+        max_pages: int = TMDB_MAX_PAGES,
+        pages_per_take: int = MAX_PAGES_PER_TAKE,
+    ):
+        self.workers = max(1, workers)
+        self.prefetch = prefetch
+        self.max_pages = max_pages
+        self.pages_per_take = max(1, pages_per_take)
+        self.next_page = 1
+        self.total_pages: Optional[int] = None
+        self.buffer: List[Dict[str, Any]] = []  # 받은 영화(페이지 순서, id 중복 제거)
+        self._ids: Set[int] = set()
+        self._prefetched: Optional[Tuple[int, Future]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def exhausted(self) -> bool:
+        last = self.max_pages if self.total_pages is None else min(self.total_pages, self.max_pages)
+        return self.next_page > last
+
+    def take(self, fetch_page: FetchPage, need: int, excluded_ids: Set[int]) -> List[Dict[str, Any]]:
+        """
+        제외 목록에 없는 앞쪽 need개. 버퍼로 모자랄 때만 다음 페이지부터 이어서 요청.
+        pages_per_take 페이지를 받아도 모자라면 모은 만큼만 반환.
+        """
+        with self._lock:
+            picked = []
+            for m in self.buffer:
+                if m["id"] not in excluded_ids:
+                    picked.append(m)
+                    if len(picked) >= need:
+                        break
+
+            requested = 0
+            short = False
+            while len(picked) < need and not self.exhausted and requested < self.pages_per_take:
+                # 처음엔 모자란 개수만큼의 페이지만, 그걸로도 모자랐으면(제외가 많음) workers개씩 동시에 요청.
+                # 결과는 페이지 순서대로 반영
+                n_pages = self.workers if short else min(self.workers, -(-(need - len(picked)) // PAGE_SIZE))
+                n_pages = min(n_pages, self.pages_per_take - requested)
+                requested += n_pages
+                short = True
+                pages = self._fetch_pages(fetch_page, n_pages)
+                try:
+                    for new in pages:
+                        picked.extend(m for m in new if m["id"] not in excluded_ids)
+                        if len(picked) >= need:
+                            break
+                finally:
+                    pages.close()
+
+            self._maybe_prefetch(fetch_page, need, excluded_ids)
+            return picked[:need]
+
+    def _fetch_pages(self, fetch_page: FetchPage, n_pages: int) -> Iterator[List[Dict[str, Any]]]:
+        last = self.max_pages if self.total_pages is None else min(self.total_pages, self.max_pages)
+        pages = list(range(self.next_page, min(self.next_page + max(1, n_pages), last + 1)))
+        futures = [self._submit(fetch_page, page) for page in pages]
+        try:
+            for fut in futures:
+                yield self._absorb(fut.result())
+        finally:
+            # 필요한 만큼 채웠으면 아직 시작 안 한 페이지는 취소(진행 중인 것은 기다리지 않음)
+            for fut in futures:
+                fut.cancel()
+
+    def _submit(self, fetch_page: FetchPage, page: int) -> Future:
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched is not None and prefetched[0] == page:
+            fut = prefetched[1]
+            if not (fut.done() and fut.exception() is not None):
+                return fut
+        return _EXECUTOR.submit(in_context(fetch_page), page)
+
+    def _absorb(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        total = data.get("total_pages")
+        if total is not None:
+            self.total_pages = int(total)
+        self.next_page += 1
+
+        new = []
+        for m in (data.get("results") or []):
+            mid = m.get("id")
+            if not mid or mid in self._ids:
+                continue
+            self._ids.add(mid)
+            self.buffer.append(m)
+            new.append(m)
+        return new
+
+    def _maybe_prefetch(self, fetch_page: FetchPage, need: int, excluded_ids: Set[int]) -> None:
+        # 다음 다시 뽑기 때 쓸 여분(화면에 보인 것 외의 미제외 영화)이 need보다 적으면 다음 페이지를 미리 받음
+        if not self.prefetch or self.exhausted or self._prefetched is not None:
+            return
+        available = sum(1 for m in self.buffer if m["id"] not in excluded_ids)
+        if available - need < need:
+            self._prefetched = (self.next_page, _EXECUTOR.submit(in_context(fetch_page), self.next_page))
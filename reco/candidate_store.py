@@ -0,0 +1,115 @@
+"""
+프로세스 전체가 공유하는 슬림 영화 레코드 저장소.
+
+세션마다 TMDB 원본 dict를 통째로 들고 있지 않도록, 카드/LLM이 실제로 쓰는 필드만
+__slots__ 레코드로 만들어 (언어, movie_id)별로 한 벌만 보관한다. 세션은 id 리스트만 저장.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+class MovieRecord:
+    """카드/LLM용 필드만 가진 영화 레코드. 기존 dict 기반 코드와 맞도록 m["id"], m.get(...)로도 읽힘."""
+
+    __slots__ = (
+        "id",
+        "title",
+        "overview",
+        "poster_path",
+        "vote_average",
+        "vote_count",
+        "release_date",
+        "popularity",
+        "trailer_url",
+        "runtime",
+        "has_extras",
+    )
+
+    def __init__(self, movie: Mapping[str, Any]):
+        self.id = int(movie["id"])
+        self.title = movie.get("title") or movie.get("name")
+        self.overview = movie.get("overview") or ""
+        self.poster_path = movie.get("poster_path")
+        self.vote_average = movie.get("vote_average")
+        self.vote_count = movie.get("vote_count")
+        self.release_date = movie.get("release_date")
+        self.popularity = movie.get("popularity")
+        self.trailer_url: Optional[str] = movie.get("trailer_url")
+        self.runtime: Optional[int] = movie.get("runtime")
+        self.has_extras = bool(movie.get("has_extras"))  # 상세/예고편(prefetch)을 이미 붙였는지
+
+    def __getitem__(self, name: str) -> Any:
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def get(self, name: str, default: Any = None) -> Any:
+        value = getattr(self, name, None)
+        return default if value is None else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if name != "has_extras"}
+
+    def __repr__(self) -> str:
+        return f"MovieRecord(id={self.id}, title={self.title!r})"
+
+
+class CandidateStore:
+    def __init__(self, maxsize: int = 50000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[str, int], MovieRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def intern(self, movie: Mapping[str, Any], language: str) -> MovieRecord:
+        """같은 (언어, id)면 이미 있는 레코드를 그대로 돌려줌(세션 간 공유)."""
+        if isinstance(movie, MovieRecord):
+            return movie
+        key = (language, int(movie["id"]))
+        with self._lock:
+            record = self._data.get(key)
+            if record is None:
+                record = self._data[key] = MovieRecord(movie)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+            else:
+                self._data.move_to_end(key)
+            return record
+
+    def intern_many(self, movies: Iterable[Mapping[str, Any]], language: str) -> List[MovieRecord]:
+        return [self.intern(m, language) for m in movies if m.get("id")]
+
+    def get_many(
+        self,
+        ids: Iterable[int],
+        language: str,
+        loader: Optional[Callable[[int], Mapping[str, Any]]] = None,
+    ) -> List[MovieRecord]:
+        """
+        id 순서대로 레코드를 돌려줌. LRU에서 밀려난 것은 loader(movie_id → TMDB 상세)로 다시 만들고,
+        loader가 없거나 실패하면 건너뜀.
+        """
+        out = []
+        for movie_id in ids:
+            with self._lock:
+                record = self._data.get((language, movie_id))
+            if record is None and loader is not None:
+                try:
+                    record = self.intern(loader(movie_id), language)
+                except Exception:
+                    record = None
+            if record is not None:
+                out.append(record)
+        return out
+
+
+CANDIDATE_STORE = CandidateStore(maxsize=int(os.getenv("CANDIDATE_STORE_MAX", "50000")))
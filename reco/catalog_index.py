@@ -0,0 +1,251 @@
+"""
+로컬 영화 카탈로그 인덱스(컬럼형, memory-mapped NumPy 배열).
+
+    # 1) TMDB discover 결과를 페이지 단위 JSONL로 덤프
+    python -m reco.catalog_index dump --api-key $TMDB_API_KEY --language ko-KR --pages 500 --out dump_ko.jsonl
+    # 2) 덤프(또는 TMDB export 파일)를 카탈로그로 적재
+    python -m reco.catalog_index ingest --language ko-KR dump_ko.jsonl
+
+<catalog_dir>(기본 .cache/catalog, MOVIE_CATALOG_DIR로 변경)/<language>/ 아래에 id/popularity/vote_average/vote_count/genre_mask 배열과
+카드·LLM용 레코드(records.jsonl + 오프셋)를 저장한다. 배열은 인기도 내림차순으로 정렬되어
+있어서 필터 결과의 앞쪽 k개가 곧 top-k.
+"""
+import argparse
+import gzip
+import json
+import mmap
+import os
+import shutil
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+DEFAULT_CATALOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "catalog")
+
+# TMDB 영화 장르 ID → 비트 위치(uint32 마스크)
+TMDB_MOVIE_GENRES = [28, 12, 16, 35, 80, 99, 18, 10751, 14, 36, 27, 10402, 9648, 10749, 878, 10770, 53, 10752, 37]
+GENRE_BITS = {gid: i for i, gid in enumerate(TMDB_MOVIE_GENRES)}
+
+# 카드/LLM이 쓰는 필드만 레코드로 보관
+RECORD_FIELDS = ["id", "title", "overview", "poster_path", "vote_average", "vote_count", "release_date", "popularity", "genre_ids"]
+
+_ARRAYS = {
+    "ids": np.int64,
+    "popularity": np.float32,
+    "vote_average": np.float32,
+    "vote_count": np.int32,
+    "genre_mask": np.uint32,
+}
+
+
+def genre_mask(genre_ids: Iterable[int]) -> int:
+    mask = 0
+    for gid in genre_ids or []:
+        bit = GENRE_BITS.get(int(gid))
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+
+# =========================
+# Query Engine
+# =========================
+class CatalogIndex:
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        for name in _ARRAYS:
+            setattr(self, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+        self.offsets = np.load(os.path.join(directory, "record_offsets.npy"), mmap_mode="r")
+        with open(os.path.join(directory, "records.jsonl"), "rb") as f:
+            self._records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    def __len__(self) -> int:
+        return int(self.ids.shape[0])
+
+    def record(self, i: int) -> Dict[str, Any]:
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return json.loads(self._records[start:end])
+
+    def query(
+        self,
+        genre_ids: List[int],
+        min_vote_count: int,
+        min_rating: float,
+        need: int,
+        excluded_ids: Iterable[int] = (),
+    ) -> List[Dict[str, Any]]:
+        """discover와 같은 의미(장르는 AND, 인기도 내림차순)로 필터한 상위 need개 레코드."""
+        want = genre_mask(genre_ids)
+        sel = (self.vote_count >= min_vote_count) & (self.vote_average >= np.float32(min_rating))
+        if want:
+            sel &= (self.genre_mask & np.uint32(want)) == want
+        idx = np.flatnonzero(sel)
+
+        excluded = np.fromiter(excluded_ids, dtype=np.int64)
+        if excluded.size and idx.size:
+            # 필터를 통과한 것들에 대해서만 제외 마스크 적용
+            idx = idx[~np.isin(self.ids[idx], excluded)]
+        return [self.record(int(i)) for i in idx[:need]]
+
+
+_catalogs: Dict[str, Any] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(language: str, base_dir: Optional[str] = None) -> Optional[CatalogIndex]:
+    """
+    언어별 카탈로그를 한 번만 열어 프로세스 전체에서 공유(없으면 None).
+    ingest로 교체되면(meta.json mtime 변경) 다시 연다. 경로는 MOVIE_CATALOG_DIR로 조정.
+    """
+    directory = os.path.join(base_dir or os.environ.get("MOVIE_CATALOG_DIR") or DEFAULT_CATALOG_DIR, language)
+    try:
+        mtime = os.stat(os.path.join(directory, "meta.json")).st_mtime
+    except OSError:
+        return None
+    with _catalogs_lock:
+        cached = _catalogs.get(directory)
+        if cached is None or cached[0] != mtime:
+            try:
+                cached = (mtime, CatalogIndex(directory))
+            except (OSError, ValueError, KeyError):
+                return None
+            _catalogs[directory] = cached
+        return cached[1]
+
+
+# =========================
+# Ingest
+# =========================
+def _open_text(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def iter_movies(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    discover 페이지({"results": [...]}), 영화 객체, 그 리스트를 담은 .json/.jsonl(.gz)에서 영화를 꺼냄.
+    TMDB export 파일(id/popularity만 있는 JSONL)도 받지만 장르/평점이 없어 필터에는 거의 안 걸림.
+    """
+
+    def unpack(obj: Any) -> Iterator[Dict[str, Any]]:
+        if isinstance(obj, list):
+            for x in obj:
+                yield from unpack(x)
+        elif isinstance(obj, dict):
+            if isinstance(obj.get("results"), list):
+                yield from unpack(obj["results"])
+            elif obj.get("id"):
+                yield obj
+
+    with _open_text(path) as f:
+        if path.endswith((".json", ".json.gz")):
+            yield from unpack(json.load(f))
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                yield from unpack(json.loads(line))
+
+
+def ingest(paths: List[str], out_dir: str) -> int:
+    """입력 파일들을 합쳐(id 기준 중복 제거) out_dir에 카탈로그를 새로 씀. 적재된 영화 수를 반환."""
+    movies: Dict[int, Dict[str, Any]] = {}
+    for path in paths:
+        for m in iter_movies(path):
+            if m.get("adult"):
+                continue
+            movies[int(m["id"])] = {k: m.get(k) for k in RECORD_FIELDS}
+
+    rows = sorted(movies.values(), key=lambda m: (-(m.get("popularity") or 0.0), m["id"]))
+
+    tmp_dir = f"{out_dir.rstrip(os.sep)}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = {
+        "ids": [m["id"] for m in rows],
+        "popularity": [m.get("popularity") or 0.0 for m in rows],
+        "vote_average": [m.get("vote_average") or 0.0 for m in rows],
+        "vote_count": [m.get("vote_count") or 0 for m in rows],
+        "genre_mask": [genre_mask(m.get("genre_ids")) for m in rows],
+    }
+    for name, dtype in _ARRAYS.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.asarray(columns[name], dtype=dtype))
+
+    offsets = [0]
+    with open(os.path.join(tmp_dir, "records.jsonl"), "wb") as f:
+        for m in rows:
+            line = json.dumps(m, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+    np.save(os.path.join(tmp_dir, "record_offsets.npy"), np.asarray(offsets, dtype=np.int64))
+
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"count": len(rows), "created_at": time.time(), "sources": [os.path.basename(p) for p in paths]}, f)
+
+    # 기존 카탈로그는 새 것이 다 써진 뒤에 교체
+    old_dir = f"{out_dir.rstrip(os.sep)}.old-{os.getpid()}"
+    if os.path.exists(out_dir):
+        os.rename(out_dir, old_dir)
+    os.rename(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return len(rows)
+
+
+def dump_discover(api_key: str, language: str, pages: int, out_path: str) -> int:
+    """장르 필터 없이 인기도순 discover 결과를 페이지마다 한 줄(JSON)로 저장. 저장한 페이지 수를 반환."""
+    from reco.tmdb_client import get_tmdb_client
+
+    client = get_tmdb_client()
+    written = 0
+    with open(out_path, "w", encoding="utf-8") as f:
+        for page in range(1, pages + 1):
+            data = client.get(
+                api_key,
+                "/discover/movie",
+                params={"language": language, "sort_by": "popularity.desc", "include_adult": "false", "page": page},
+            )
+            f.write(json.dumps(data, ensure_ascii=False) + "\n")
+            written += 1
+            if page >= int(data.get("total_pages") or 0):
+                break
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m reco.catalog_index", description="로컬 영화 카탈로그 인덱스 관리")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_dump = sub.add_parser("dump", help="TMDB discover 결과를 JSONL로 덤프")
+    p_dump.add_argument("--api-key", default=os.environ.get("TMDB_API_KEY"))
+    p_dump.add_argument("--language", default="ko-KR")
+    p_dump.add_argument("--pages", type=int, default=500, help="TMDB discover는 최대 500페이지")
+    p_dump.add_argument("--out", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="덤프/export 파일을 카탈로그로 적재")
+    p_ingest.add_argument("paths", nargs="+")
+    p_ingest.add_argument("--language", default="ko-KR")
+    p_ingest.add_argument("--catalog-dir", default=os.environ.get("MOVIE_CATALOG_DIR") or DEFAULT_CATALOG_DIR)
+
+    args = parser.parse_args(argv)
+    if args.command == "dump":
+        if not args.api_key:
+            parser.error("--api-key 또는 TMDB_API_KEY가 필요합니다.")
+        n = dump_discover(args.api_key, args.language, args.pages, args.out)
+        print(f"{n} pages → {args.out}")
+    else:
+        out_dir = os.path.join(args.catalog_dir, args.language)
+        os.makedirs(args.catalog_dir, exist_ok=True)
+        n = ingest(args.paths, out_dir)
+        print(f"{n} movies → {out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
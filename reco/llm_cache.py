@@ -0,0 +1,105 @@
+"""
+LLM 최종 추천 결과 캐시 + API 키별로 재사용하는 OpenAI 클라이언트 풀.
+
+같은 상황(정규화 후)·무드·후보 집합·언어면 토큰을 쓰지 않고 이전 결과를 돌려준다.
+키에는 OpenAI API 키가 들어가지 않으므로 사용자 간에도 결과를 공유.
+"""
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from openai import OpenAI
+
+_PUNCT = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+class TTLLRUCache:
+    """스레드 안전 TTL + LRU 캐시(hit/miss/eviction 카운터 포함)."""
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 6 * 60 * 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+def normalize_situation(text: str) -> str:
+    """NFKC + 소문자 + 문장부호/이모지 제거 + 공백 정리("웃고 싶어요!!" == "웃고  싶어요")."""
+    t = unicodedata.normalize("NFKC", text or "").lower()
+    return _SPACES.sub(" ", _PUNCT.sub(" ", t)).strip()
+
+
+def pick_cache_key(situation: str, mood_label: str, candidate_ids: Iterable[Any], language: str) -> Tuple:
+    ids = tuple(sorted(int(i) for i in candidate_ids if i))
+    return (normalize_situation(situation), mood_label, ids, language)
+
+
+PICK_CACHE = TTLLRUCache()
+
+
+# =========================
+# OpenAI client pool
+# =========================
+_clients: "OrderedDict[str, OpenAI]" = OrderedDict()
+_clients_lock = threading.Lock()
+MAX_CLIENTS = 64
+
+
+def get_openai_client(api_key: str) -> OpenAI:
+    """API 키별로 하나의 클라이언트(내부 HTTP 커넥션 풀 포함)를 재사용. 원문 키는 dict 키로 쓰지 않음."""
+    key_id = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    with _clients_lock:
+        client = _clients.get(key_id)
+        if client is not None:
+            _clients.move_to_end(key_id)
+            return client
+        client = OpenAI(api_key=api_key)
+        _clients[key_id] = client
+        while len(_clients) > MAX_CLIENTS:
+            # close()하지 않음: 추측 실행/배치 스레드가 아직 쓰는 중일 수 있으므로 GC에 맡김
+            _clients.popitem(last=False)
+        return client
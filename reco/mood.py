@@ -0,0 +1,136 @@
+"""
+규칙 기반 무드 분류기. 모듈 import 시 한 번만 만들어 프로세스 전체가 공유한다.
+
+모든 키워드를 하나의 정규식(alternation)으로 컴파일해 텍스트를 한 번만 훑고,
+키워드별 가중치를 더한다. "액션 말고", "무서운 건 싫어", "안 슬픈"처럼 부정된 키워드는 감점.
+"""
+import functools
+import re
+from typing import Dict, Iterable, List, Tuple
+
+# 장르 ID (요청에서 주어진 것)
+GENRE_IDS = {
+    "액션": 28,
+    "코미디": 35,
+    "드라마": 18,
+    "SF": 878,
+    "로맨스": 10749,
+    "판타지": 14,
+}
+
+AUTO_MOOD = "자동 분류"
+DEFAULT_MOOD = "힐링/잔잔"
+MOOD_LABELS = ["힐링/잔잔", "감성/여운", "통쾌/에너지", "현실도피/판타지", "웃음/가벼움", "긴장/스릴"]
+
+MOOD_GENRES: Dict[str, List[int]] = {
+    "힐링/잔잔": [GENRE_IDS["드라마"]],
+    "감성/여운": [GENRE_IDS["로맨스"], GENRE_IDS["드라마"]],
+    "통쾌/에너지": [GENRE_IDS["액션"]],
+    "현실도피/판타지": [GENRE_IDS["SF"], GENRE_IDS["판타지"]],
+    "웃음/가벼움": [GENRE_IDS["코미디"]],
+    "긴장/스릴": [GENRE_IDS["액션"], GENRE_IDS["SF"]],
+}
+
+# 무드를 직접 고른 경우의 설명
+MANUAL_REASONS = {
+    "힐링/잔잔": "지금은 마음을 안정시키는 ‘잔잔한 흐름’이 우선이라 봤어요.",
+    "감성/여운": "감정선과 여운이 필요한 상황이라 봤어요.",
+    "통쾌/에너지": "답답함을 뚫는 속도감/해결감이 필요한 상황이라 봤어요.",
+    "현실도피/판타지": "현실을 잠시 잊게 해줄 세계관이 필요한 상황이라 봤어요.",
+    "웃음/가벼움": "가볍게 웃고 기분을 리셋하는 게 우선이라 봤어요.",
+    "긴장/스릴": "집중해서 몰입할 ‘긴장감’이 필요한 상황이라 봤어요.",
+}
+
+# 텍스트에서 자동 분류한 경우의 설명
+AUTO_REASONS = {
+    "힐링/잔잔": "피로를 낮추고 마음을 정돈하는 흐름이 우선으로 보여서, 잔잔한 드라마 중심으로 골랐어요.",
+    "감성/여운": "감정의 결이 중요한 상황으로 보여서, 여운이 남는 로맨스/드라마를 우선 추천해요.",
+    "통쾌/에너지": "답답함을 해소할 ‘해결감’이 필요해 보여서, 속도감 있는 액션을 우선 추천해요.",
+    "현실도피/판타지": "현실에서 잠깐 벗어나고 싶어 보여서, SF/판타지 중심으로 추천해요.",
+    "웃음/가벼움": "가볍게 웃으며 리셋하는 게 최우선으로 보여서, 코미디를 우선 추천해요.",
+    "긴장/스릴": "집중해서 몰입할 자극이 필요해 보여서, 긴장감 높은 액션/SF로 추천해요.",
+}
+
+# 무드별 (키워드: 가중치). 장르/무드를 직접 말하는 단어는 3, 정황을 암시하는 단어는 1~2.
+MOOD_KEYWORDS: Dict[str, Dict[str, int]] = {
+    "힐링/잔잔": {"힐링": 3, "잔잔": 3, "편안": 2, "쉬고": 2, "지쳤": 2, "지쳐": 2, "위로": 2, "따뜻": 2, "포근": 2, "안정": 1, "휴식": 2},
+    "감성/여운": {"감성": 3, "여운": 3, "눈물": 2, "울고": 2, "연애": 2, "사랑": 2, "이별": 2, "설렘": 2, "로맨스": 3},
+    "통쾌/에너지": {"통쾌": 3, "사이다": 3, "스트레스": 1, "답답": 2, "화나": 2, "빡치": 2, "에너지": 2, "액션": 3, "카타르시스": 3},
+    "현실도피/판타지": {"현실도피": 3, "판타지": 3, "마법": 2, "우주": 2, "외계": 2, "미래": 1, "세계관": 2, "sf": 3, "모험": 2},
+    "웃음/가벼움": {"웃고": 3, "웃긴": 3, "코미디": 3, "빵터": 3, "가볍": 1, "기분전환": 2, "유머": 2},
+    "긴장/스릴": {"긴장": 3, "몰입": 2, "스릴": 3, "서스펜스": 3, "추격": 2, "전투": 2, "위기": 1, "손에땀": 3},
+}
+
+# 키워드 바로 앞/뒤에 붙는 부정 표현(앞쪽은 키워드 시작 위치를 endpos로 .search, 뒤쪽은 끝 위치에서 .match)
+# 앞쪽은 lookbehind로 실제 단어 경계만 인정("불안 긴장"의 '안'은 부정이 아님)
+_NEGATION_BEFORE = re.compile(r"(?<!\S)(?:안|못|덜)\s*$")
+_NEGATION_AFTER = re.compile(r"\s*(?:(?:은|는|이|가|을|를|도|영화|같은|류|물|쪽|장르|건|것)\s*)*(?:말고|빼고|싫|제외|아닌|아니|별로)")
+
+MoodResult = Tuple[str, List[int], str]
+
+
+class MoodClassifier:
+    def __init__(self, keywords: Dict[str, Dict[str, int]], cache_size: int = 4096):
+        self._weights: Dict[str, Tuple[str, int]] = {}
+        for mood, words in keywords.items():
+            for word, weight in words.items():
+                self._weights[word.lower()] = (mood, weight)
+        # 긴 키워드가 먼저 매칭되도록 정렬한 단일 alternation
+        alternation = "|".join(re.escape(w) for w in sorted(self._weights, key=len, reverse=True))
+        self._pattern = re.compile(alternation)
+        self._classify_cached = functools.lru_cache(maxsize=cache_size)(self._classify)
+
+    def scores(self, text: str) -> Dict[str, int]:
+        t = (text or "").lower()
+        score = {k: 0 for k in MOOD_LABELS}
+        counted = set()
+        for match in self._pattern.finditer(t):
+            word = match.group(0)
+            negated = bool(
+                _NEGATION_BEFORE.search(t, 0, match.start())
+                or _NEGATION_AFTER.match(t, match.end())
+            )
+            # 같은 키워드의 반복은 한 번만 반영(긍정/부정 각각)
+            if (word, negated) in counted:
+                continue
+            counted.add((word, negated))
+            mood, weight = self._weights[word]
+            score[mood] += -weight if negated else weight
+        return score
+
+    def _classify(self, text: str, fallback: str) -> Tuple[str, Tuple[int, ...], str]:
+        if fallback != AUTO_MOOD:
+            return fallback, tuple(MOOD_GENRES[fallback]), MANUAL_REASONS[fallback]
+
+        score = self.scores(text)
+        best = max(score, key=lambda k: score[k])
+        mood = best if score[best] > 0 else DEFAULT_MOOD
+        return mood, tuple(MOOD_GENRES[mood]), AUTO_REASONS[mood]
+
+    def classify(self, text: str, fallback: str = AUTO_MOOD) -> MoodResult:
+        """(무드 라벨, 장르 ID 리스트, 추천 근거). 같은 (text, fallback)은 캐시에서 바로 반환."""
+        mood, genres, reason = self._classify_cached(text or "", fallback)
+        return mood, list(genres), reason
+
+    def classify_many(self, texts: Iterable[str], fallback: str = AUTO_MOOD) -> List[MoodResult]:
+        """오프라인 평가용 배치 분류. 중복 텍스트는 한 번만 계산하고, 온라인 LRU 캐시는 건드리지 않음."""
+        seen: Dict[str, Tuple[str, Tuple[int, ...], str]] = {}
+        out = []
+        for text in texts:
+            text = text or ""
+            if text not in seen:
+                seen[text] = self._classify(text, fallback)
+            mood, genres, reason = seen[text]
+            out.append((mood, list(genres), reason))
+        return out
+
+
+MOOD_CLASSIFIER = MoodClassifier(MOOD_KEYWORDS)
+
+
+def classify_mood(text: str, fallback: str) -> MoodResult:
+    return MOOD_CLASSIFIER.classify(text, fallback)
+
+
+def classify_many(texts: Iterable[str], fallback: str = AUTO_MOOD) -> List[MoodResult]:
+    return MOOD_CLASSIFIER.classify_many(texts, fallback)
@@ -0,0 +1,78 @@
+"""
+스트리밍 중인(아직 덜 끝난) 최종 추천 JSON에서 필드를 뽑는 증분 파서.
+
+structured output 스키마가 필드 순서를 movie_id → title → reason으로 고정하므로,
+movie_id가 나오자마자 제목을 보여주고 reason은 글자가 들어오는 대로 흘려 보낼 수 있다.
+"""
+import re
+from typing import Any, Dict, Optional
+
+_MOVIE_ID = re.compile(r'"movie_id"\s*:\s*(-?\d+)\s*[,}\s]')
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def _partial_string(buf: str, start: int) -> str:
+    """buf[start:]부터 JSON 문자열 본문을 디코드. 닫는 따옴표가 없으면 지금까지 온 부분만."""
+    out = []
+    i, n = start, len(buf)
+    while i < n:
+        ch = buf[i]
+        if ch == '"':
+            break
+        if ch != "\\":
+            out.append(ch)
+            i += 1
+            continue
+        # 이스케이프가 아직 다 안 들어왔으면 여기서 멈춤
+        if i + 1 >= n:
+            break
+        esc = buf[i + 1]
+        if esc == "u":
+            if i + 6 > n:
+                break
+            code = int(buf[i + 2:i + 6], 16)
+            i += 6
+            if 0xD800 <= code < 0xDC00:
+                # 서로게이트 쌍(이모지 등)은 뒤쪽 \uDCxx까지 와야 한 글자로 합침
+                if i + 6 > n and buf.startswith("\\u"[:n - i], i):
+                    break
+                low = int(buf[i + 2:i + 6], 16) if buf.startswith("\\u", i) else 0
+                if 0xDC00 <= low < 0xE000:
+                    code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                    i += 6
+                else:
+                    code = 0xFFFD
+            elif 0xDC00 <= code < 0xE000:
+                code = 0xFFFD  # 짝 없는 서로게이트는 화면에 쓸 수 없으므로 대체 문자로
+            out.append(chr(code))
+        else:
+            out.append(_ESCAPES.get(esc, esc))
+            i += 2
+    return "".join(out)
+
+
+class PartialPickParser:
+    def __init__(self):
+        self.buf = ""
+        self.movie_id: Optional[int] = None
+        self._starts: Dict[str, int] = {}
+
+    def feed(self, delta: str) -> Dict[str, Any]:
+        self.buf += delta
+        return self.state()
+
+    def state(self) -> Dict[str, Any]:
+        if self.movie_id is None:
+            m = _MOVIE_ID.search(self.buf)
+            if m:
+                self.movie_id = int(m.group(1))
+        return {"movie_id": self.movie_id, "title": self._field("title"), "reason": self._field("reason")}
+
+    def _field(self, name: str) -> Optional[str]:
+        start = self._starts.get(name)
+        if start is None:
+            m = re.search(rf'"{name}"\s*:\s*"', self.buf)
+            if not m:
+                return None
+            start = self._starts[name] = m.end()
+        return _partial_string(self.buf, start)
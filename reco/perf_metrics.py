@@ -0,0 +1,360 @@
+"""
+rerun 단위 트레이싱 span + 프로세스 전체 지표(Prometheus 텍스트 형식).
+
+    with span("classify"):
+        ...
+    @traced("fetch_candidates")
+    def fetch_candidates(...): ...
+
+span은 지연시간과 속성(HTTP 상태, 바이트, 캐시 결과 등)을 현재 trace(contextvar)에 남기고,
+이름별 히스토그램에도 누적한다. 스레드 풀로 넘기는 함수는 in_context(fn)로 감싸면
+같은 trace에 기록된다.
+
+내보내기(둘 다 선택, 환경변수):
+    RECO_METRICS_FILE=/tmp/reco.prom   # RECO_METRICS_INTERVAL초마다(기본 15) 원자적으로 덮어씀
+                                       # 워커(프로세스)마다 한 파일: /tmp/reco.<pid>.prom ("{pid}"로 위치 지정 가능)
+    RECO_METRICS_PORT=9108             # http://127.0.0.1:9108/metrics (RECO_METRICS_HOST로 변경)
+                                       # 포트를 못 열면(이미 사용 중) HTTP만 끄고 파일은 계속 씀
+"""
+import atexit
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# 히스토그램 버킷(초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# trace 하나에 남길 최대 span 수(fragment rerun이 같은 trace에 계속 쌓이는 경우 대비)
+MAX_SPANS_PER_TRACE = 2000
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+
+# =========================
+# Process-wide metrics
+# =========================
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def expose(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(k)} {v:g}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelKey, List[float]] = {}  # [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += 1
+            row[-1] += value
+
+    def expose(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, row in items:
+            for bound, n in zip(self.buckets, row):
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {n:g}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {row[-2]:g}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {row[-1]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {row[-2]:g}")
+        return lines
+
+
+SPAN_SECONDS = Histogram("reco_span_duration_seconds", "Latency of traced stages (classify, tmdb.*, http, llm, render, ...).")
+HTTP_REQUESTS = Counter("reco_tmdb_http_requests_total", "TMDB HTTP responses by endpoint and status (retries included; status=error for connection errors/timeouts).")
+HTTP_SECONDS = Histogram("reco_tmdb_http_duration_seconds", "TMDB GET latency by endpoint (retries and backoff included).")
+HTTP_BYTES = Counter("reco_tmdb_http_response_bytes_total", "TMDB response body bytes by endpoint.")
+CACHE_REQUESTS = Counter("reco_cache_requests_total", "Disk cache lookups by namespace and outcome (hit/stale/miss).")
+LLM_REQUESTS = Counter("reco_llm_requests_total", "Final-pick requests by outcome (cache_hit/ok/fallback).")
+METRICS = [SPAN_SECONDS, HTTP_REQUESTS, HTTP_SECONDS, HTTP_BYTES, CACHE_REQUESTS, LLM_REQUESTS]
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines += metric.expose()
+    return "\n".join(lines) + "\n"
+
+
+# =========================
+# Trace / Span
+# =========================
+class Span:
+    __slots__ = ("name", "attrs", "depth", "start", "duration_ms", "thread")
+
+    def __init__(self, name: str, attrs: Dict[str, Any], depth: int):
+        self.name = name
+        self.attrs = attrs
+        self.depth = depth
+        self.start = time.perf_counter()
+        self.duration_ms = 0.0
+        self.thread = threading.current_thread().name
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+class Trace:
+    """rerun 한 번(또는 배치 항목 하나)의 span 목록. 여러 스레드에서 동시에 추가됨."""
+
+    def __init__(self, name: str = "rerun"):
+        self.name = name
+        self.started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, s: Span) -> None:
+        with self._lock:
+            if len(self.spans) < MAX_SPANS_PER_TRACE:
+                self.spans.append(s)
+            else:
+                self.dropped += 1
+
+    def finish(self) -> None:
+        self.duration_ms = (time.perf_counter() - self.started) * 1000
+        SPAN_SECONDS.observe(self.duration_ms / 1000, span=self.name)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """시작 순서대로 span 한 줄씩(디버그 패널용)."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        return [
+            {
+                "span": "  " * s.depth + s.name,
+                "start_ms": round((s.start - self.started) * 1000, 1),
+                "ms": round(s.duration_ms, 1),
+                "thread": s.thread,
+                **{k: v for k, v in s.attrs.items() if v is not None},
+            }
+            for s in spans
+        ]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """span 이름별 횟수/합계/최대(ms) + 캐시 결과 분포."""
+        with self._lock:
+            spans = list(self.spans)
+        out: Dict[str, Dict[str, Any]] = {}
+        for s in spans:
+            row = out.setdefault(s.name, {"span": s.name, "count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            row["count"] += 1
+            row["total_ms"] += s.duration_ms
+            row["max_ms"] = max(row["max_ms"], s.duration_ms)
+            cache = s.attrs.get("cache")
+            if cache:
+                row[f"cache_{cache}"] = row.get(f"cache_{cache}", 0) + 1
+        for row in out.values():
+            row["total_ms"] = round(row["total_ms"], 1)
+            row["max_ms"] = round(row["max_ms"], 1)
+        return sorted(out.values(), key=lambda r: -r["total_ms"])
+
+
+_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("reco_trace", default=None)
+_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("reco_span", default=None)
+
+
+def start_trace(name: str = "rerun") -> Trace:
+    """현재 스레드(컨텍스트)의 새 trace를 시작. Streamlit은 세션마다 스크립트 스레드가 따로라 세션끼리 섞이지 않음."""
+    trace = Trace(name)
+    _trace.set(trace)
+    _span.set(None)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    parent = _span.get()
+    s = Span(name, attrs, 0 if parent is None else parent.depth + 1)
+    token = _span.set(s)
+    try:
+        yield s
+    except Exception as e:
+        s.attrs.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        _span.reset(token)
+        s.duration_ms = (time.perf_counter() - s.start) * 1000
+        SPAN_SECONDS.observe(s.duration_ms / 1000, span=name)
+        trace = _trace.get()
+        if trace is not None:
+            trace.add(s)
+
+
+def annotate(**attrs: Any) -> None:
+    """가장 안쪽의 열린 span에 속성 추가(열린 span이 없으면 무시)."""
+    s = _span.get()
+    if s is not None:
+        s.attrs.update(attrs)
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def in_context(fn: Callable) -> Callable:
+    """
+    지금의 trace/span을 워커 스레드로 넘기는 래퍼(executor.submit/map 전에 감쌈).
+    같은 Context는 두 스레드가 동시에 들어갈 수 없으므로 호출마다 복사본에서 실행.
+    """
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return ctx.copy().run(fn, *args, **kwargs)
+
+    return wrapper
+
+
+# =========================
+# Export (file / HTTP)
+# =========================
+def write_metrics_file(path: str) -> None:
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render_prometheus())
+    os.replace(tmp, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # 스크레이프마다 로그를 남기지 않음
+
+
+class MetricsExporter(threading.Thread):
+    def __init__(self, path: Optional[str], interval: float, port: Optional[int], host: str = "127.0.0.1"):
+        super().__init__(name="metrics-exporter", daemon=True)
+        self.path = path
+        self.interval = interval
+        self.server: Optional[ThreadingHTTPServer] = None
+        if port:
+            try:
+                self.server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError:
+                pass  # 포트가 이미 쓰이는 중(다른 워커 등)이면 HTTP만 끄고 파일 내보내기는 유지
+            else:
+                self.server.daemon_threads = True
+                threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while self.path and not self._stop_event.wait(self.interval):
+            self.flush()
+
+    def flush(self) -> None:
+        if self.path:
+            try:
+                write_metrics_file(self.path)
+            except OSError:
+                pass  # 다음 주기에 다시 시도
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.flush()
+        if self.server is not None:
+            self.server.shutdown()
+
+
+def metrics_file_path(template: Optional[str], pid: Optional[int] = None) -> Optional[str]:
+    """워커별 지표 파일 경로(여러 프로세스가 같은 파일을 덮어쓰지 않도록)."""
+    if not template:
+        return None
+    pid = os.getpid() if pid is None else pid
+    if "{pid}" in template:
+        return template.replace("{pid}", str(pid))
+    root, ext = os.path.splitext(template)
+    return f"{root}.{pid}{ext}"
+
+
+_exporter: Optional[MetricsExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def start_exporter() -> Optional[MetricsExporter]:
+    """
+    RECO_METRICS_FILE / RECO_METRICS_PORT가 있으면 프로세스당 한 번 내보내기 시작(없으면 None).
+    파일은 종료 시에도 한 번 더 쓴다(배치 CLI 등 짧게 끝나는 프로세스).
+    지표는 프로세스 단위라 파일도 워커마다 하나: 경로의 "{pid}"를 pid로 바꾸고,
+    없으면 확장자 앞에 pid를 붙인다(metrics.prom → metrics.12345.prom). 합산은 수집 쪽에서.
+    """
+    global _exporter
+    path = metrics_file_path(os.environ.get("RECO_METRICS_FILE") or None)
+    port = int(os.environ.get("RECO_METRICS_PORT") or 0) or None
+    if not path and not port:
+        return None
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = MetricsExporter(
+                path,
+                interval=float(os.environ.get("RECO_METRICS_INTERVAL", 15)),
+                port=port,
+                host=os.environ.get("RECO_METRICS_HOST", "127.0.0.1"),
+            )
+            _exporter.start()
+            atexit.register(_exporter.flush)
+        return _exporter
@@ -0,0 +1,212 @@
+"""
+Streamlit 없이 import할 수 있는 추천 파이프라인(후보 수집 → 상세/예고편 → LLM 최종 1편).
+
+app.py(UI)와 reco.batch(오프라인 배치)가 같은 함수를 쓴다. 세션 상태는 다루지 않으므로
+제외 목록/커서 같은 상태는 호출하는 쪽이 넘겨준다.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from reco.candidate_cursor import CandidateCursor
+from reco.candidate_store import CANDIDATE_STORE, MovieRecord
+from reco.catalog_index import CatalogIndex
+from reco.llm_cache import PICK_CACHE, get_openai_client, pick_cache_key
+from reco.partial_json import PartialPickParser
+from reco.perf_metrics import LLM_REQUESTS, annotate, in_context, traced
+from reco.prompt_builder import build_pick_prompt, pick_output_format, usage_report
+from reco.ranking import local_pick, rank_candidates
+from reco.tmdb_api import discover_movies_cached, movie_details_cached
+
+# 후보가 모자랄 때 동시에 요청할 discover 페이지 수
+DISCOVER_FETCH_WORKERS = 3
+# 후보별 상세/예고편을 동시에 가져올 때의 최대 동시 요청 수
+PREFETCH_WORKERS = 8
+# 로컬 랭킹 후 LLM에 넘길 후보 수
+LLM_CANDIDATE_TOP_K = 6
+# 최종 추천에 쓰는 모델
+LLM_MODEL = "gpt-5-mini"
+
+
+def pick_trailer_youtube(videos_obj: Dict[str, Any]) -> Optional[str]:
+    results = (videos_obj or {}).get("results") or []
+    for v in results:
+        if v.get("site") == "YouTube" and v.get("type") == "Trailer" and v.get("key"):
+            return f"https://www.youtube.com/watch?v={v['key']}"
+    for v in results:
+        if v.get("site") == "YouTube" and v.get("key"):
+            return f"https://www.youtube.com/watch?v={v['key']}"
+    return None
+
+
+@traced("fetch_candidates")
+def fetch_candidates(
+    api_key: str,
+    genre_ids: List[int],
+    language: str,
+    region: str,
+    min_vote_count: int,
+    min_rating: float,
+    need: int,
+    excluded_ids: set,
+    parallel: bool = True,
+    catalog: Optional[CatalogIndex] = None,
+    cursor: Optional[CandidateCursor] = None,
+) -> List[MovieRecord]:
+    genre_csv = ",".join(str(x) for x in genre_ids)
+    movies: List[MovieRecord] = []
+
+    # 로컬 카탈로그가 있으면 먼저 채움(네트워크 X). region은 release date 필터에만 쓰여 여기선 무시.
+    if catalog is not None:
+        movies = CANDIDATE_STORE.intern_many(
+            catalog.query(genre_ids, min_vote_count, min_rating, need, excluded_ids), language
+        )
+        if len(movies) >= need:
+            return movies
+
+    def fetch_page(page: int) -> Dict[str, Any]:
+        data = discover_movies_cached(api_key, genre_csv, language, region, min_vote_count, min_rating, page)
+        # 원본 dict 대신 공용 저장소의 슬림 레코드로(커서/세션은 참조만 보관)
+        return {
+            "total_pages": data.get("total_pages"),
+            "results": CANDIDATE_STORE.intern_many(data.get("results") or [], language),
+        }
+
+    # 부족분만 API로: 커서가 이미 받은 페이지는 재사용하고, 모자라면 다음 페이지부터 이어서 요청
+    # (parallel이면 모자란 만큼의 페이지를 동시에 요청, 결과는 항상 페이지 순서대로)
+    if cursor is None:
+        cursor = CandidateCursor(workers=DISCOVER_FETCH_WORKERS if parallel else 1, prefetch=False)
+    skip = set(excluded_ids) | {m["id"] for m in movies}
+    movies.extend(cursor.take(fetch_page, need - len(movies), skip))
+    return movies
+
+
+@traced("prefetch_extras")
+def prefetch_movie_extras(api_key: str, candidates: List[MovieRecord], language: str) -> List[MovieRecord]:
+    """
+    후보 전체의 상세+예고편을 동시에 가져와 레코드에 붙여 반환(trailer_url, runtime).
+    레코드는 프로세스 공용이라 이미 붙어 있는 영화는 건너뜀.
+    카드 렌더링은 이 값만 읽으므로 rerun 때 네트워크 호출이 없음.
+    """
+
+    def load(m: MovieRecord) -> Dict[str, Any]:
+        try:
+            return movie_details_cached(api_key, m.id, language)
+        except Exception:
+            return {}
+
+    todo = [m for m in candidates if not m.has_extras]
+    if not todo:
+        return candidates
+    with ThreadPoolExecutor(max_workers=min(PREFETCH_WORKERS, len(todo)), thread_name_prefix="prefetch") as ex:
+        details_list = list(ex.map(in_context(load), todo))
+
+    for m, details in zip(todo, details_list):
+        if not details:
+            continue  # 실패(429/타임아웃 등)한 건 공용 레코드에 남기지 않음 → 다음 후보 가져오기 때 다시 시도
+        m.trailer_url = pick_trailer_youtube(details.get("videos"))
+        m.runtime = details.get("runtime")
+        m.has_extras = True
+    return candidates
+
+
+@traced("llm")
+def llm_pick_one_movie(
+    openai_api_key: str,
+    situation_text: str,
+    mood_label: str,
+    candidates: List[MovieRecord],
+    language: str,
+    on_update: Optional[Callable[[Dict[str, Any]], None]] = None,
+    token_budget: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    on_update를 주면 스트리밍으로 받아, 부분 결과가 바뀔 때마다
+    on_update({"movie_id": int|None, "title": str|None, "reason": str|None})를 호출.
+    token_budget: 프롬프트 전체 토큰 예산(줄거리 길이를 여기에 맞춰 조절, 기본은 LLM_PROMPT_TOKEN_BUDGET)
+    Returns:
+      {"movie_id": int, "title": str, "reason": str, "usage": {...}}
+      (fallback이면 usage 없음, 추천 결과 캐시에서 나온 것이면 usage 대신 "cached": True)
+    """
+    # 같은 (정규화된 상황, 무드, 후보 id 집합, 언어)면 LLM 호출 없이 바로 반환
+    cache_key = pick_cache_key(situation_text, mood_label, [m.get("id") for m in candidates], language)
+    hit = PICK_CACHE.get(cache_key)
+    if hit is not None:
+        LLM_REQUESTS.inc(outcome="cache_hit")
+        annotate(cache="hit")
+        # 토큰은 처음 호출에서 쓴 것이므로 usage는 빼고 캐시 결과임을 표시
+        result = {k: v for k, v in hit.items() if k != "usage"}
+        result["cached"] = True
+        return result
+
+    client = get_openai_client(openai_api_key)
+
+    # 로컬 랭킹으로 상황에 가까운 후보만 남김(LLM 입력 축소 + 실패 시 fallback 기준)
+    ranked = rank_candidates(situation_text, mood_label, candidates, top_k=LLM_CANDIDATE_TOP_K)
+
+    # 고정 내용이 앞에 오는 compact 프롬프트(줄거리는 토큰 예산에 맞춰 자름)
+    prompt = build_pick_prompt(situation_text, mood_label, ranked, language, token_budget)
+    titles = {int(m["id"]): m.get("title") or m.get("name") for m in ranked}
+    request = dict(
+        model=LLM_MODEL,
+        input=[
+            {"role": "system", "content": prompt.system},
+            {"role": "user", "content": prompt.user},
+        ],
+        # 출력 형식을 스키마로 고정(movie_id는 후보 id 중 하나)
+        text=pick_output_format(list(titles)),
+    )
+
+    try:
+        if on_update is None:
+            # Responses API: output_text에 모델의 텍스트 출력이 들어옴
+            resp = client.responses.create(**request)
+            text, usage = resp.output_text, getattr(resp, "usage", None)
+        else:
+            parser = PartialPickParser()
+            last_state = None
+            usage = None
+            rendering = True
+            for event in client.responses.create(stream=True, **request):
+                if event.type == "response.output_text.delta":
+                    state = parser.feed(event.delta)
+                    if rendering and state != last_state:
+                        last_state = state
+                        try:
+                            on_update(state)
+                        except Exception as e:
+                            # 화면 갱신 실패는 응답과 무관 → 부분 표시만 멈추고 결과는 끝까지 받음(fallback 아님)
+                            rendering = False
+                            annotate(render_error=type(e).__name__)
+                elif event.type == "response.completed":
+                    usage = getattr(event.response, "usage", None)
+                elif event.type in ("response.failed", "response.incomplete", "error"):
+                    raise RuntimeError(event.type)
+            text = parser.buf
+
+        data = json.loads(text.strip())
+        if int(data["movie_id"]) not in titles:
+            raise ValueError("not in candidates")
+        result = {
+            "movie_id": int(data["movie_id"]),
+            "title": str(titles[int(data["movie_id"])] or data["title"]),
+            "reason": str(data["reason"]),
+            "usage": usage_report(prompt, usage),
+        }
+    except Exception as e:
+        # 호출/파싱 실패 시: 로컬 랭킹 1위로 fallback
+        LLM_REQUESTS.inc(outcome="fallback")
+        annotate(cache="miss", outcome="fallback", error=type(e).__name__)
+        return local_pick(situation_text, mood_label, ranked)
+
+    LLM_REQUESTS.inc(outcome="ok")
+    annotate(
+        cache="miss",
+        outcome="ok",
+        stream=on_update is not None,
+        input_tokens=result["usage"].get("input_tokens"),
+        output_tokens=result["usage"].get("output_tokens"),
+    )
+    # 실제 LLM 결과만 캐시(fallback은 다음에 다시 시도)
+    PICK_CACHE.set(cache_key, result)
+    return result
@@ -0,0 +1,160 @@
+"""
+llm_pick_one_movie용 프롬프트 빌더.
+
+- 고정 내용(역할/선택 기준/출력 형식)을 system에 몰아 프롬프트 앞부분이 매 호출 동일
+  → 제공자 측 prefix 캐시가 잘 걸림
+- 후보는 짧은 키의 compact JSON, 상황 텍스트처럼 자주 바뀌는 값은 맨 뒤
+- 줄거리는 전체 토큰 예산에 맞춰 길이를 나눠 자름(짧은 줄거리가 남긴 몫은 긴 것에 재분배)
+"""
+import functools
+import json
+import math
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
+DEFAULT_TOKEN_BUDGET = int(os.environ.get("LLM_PROMPT_TOKEN_BUDGET", 1600))
+
+SYSTEM_PROMPT = (
+    "당신은 영화 추천 전문가입니다. 사용자의 '상황/기분'과 '무드'에 가장 잘 맞는 영화 한 편만 고릅니다.\n"
+    "- 과장/허위 없이, 후보 목록 안에서만 선택하세요.\n"
+    "- 선택 기준(중요한 순서): 1) 상황과 무드에의 적합도 "
+    "2) 접근성(너무 무겁거나 극단적으로 난해한 작품은 피함) 3) 대중성(평점/인기도 참고, 단 맹신하지 않음)\n"
+    "- 추천 사유는 2~4문장으로 짧고 명확하게, 사용자 입력의 language로 작성하세요.\n"
+    "- 입력 JSON: candidates[{id, title, rating(10점 만점), votes, year, overview}], mood, language, situation\n"
+    "- 출력은 반드시 JSON만: {\"movie_id\":..., \"title\":..., \"reason\":...}\n"
+)
+
+@functools.lru_cache(maxsize=1)
+def _encoding() -> Any:
+    """
+    tiktoken 인코딩(처음 토큰을 셀 때 한 번만 로드). get_encoding은 BPE 파일을 내려받을 수 있어
+    import 시점이 아니라 여기서 부른다. tiktoken이 없거나 인코딩을 못 받으면 None → 근사치 사용.
+    """
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # 근사: 영문/숫자/기호는 약 4자당 1토큰, 한글 등 비ASCII는 글자당 약 0.7토큰
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) * 0.7)
+
+
+def _compact(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _water_fill(lengths: List[int], budget: int) -> List[int]:
+    """각자 최대 lengths[i]까지, 합이 budget을 넘지 않게 최대한 고르게 나눔."""
+    alloc = [0] * len(lengths)
+    remaining = max(0, budget)
+    pending = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    while pending and remaining > 0:
+        share = remaining // len(pending)
+        i = pending[0]
+        if lengths[i] <= share:
+            alloc[i] = lengths[i]
+            remaining -= lengths[i]
+            pending.pop(0)
+        else:
+            for j in pending:
+                alloc[j] = share
+            break
+    return alloc
+
+
+def _truncate(text: str, tokens: int, total_tokens: int) -> str:
+    if tokens >= total_tokens:
+        return text
+    if tokens <= 0:
+        return ""
+    cut = max(1, int(len(text) * tokens / total_tokens) - 1)
+    return text[:cut].rstrip() + "…"
+
+
+class PickPrompt(NamedTuple):
+    system: str
+    user: str
+    tokens: int  # system + user 추정 토큰 수
+    overview_tokens: int  # 그중 줄거리 몫
+
+
+def pick_output_format(candidate_ids: List[int]) -> Dict[str, Any]:
+    """structured output 스키마(movie_id는 후보 id 중 하나, 필드 순서 movie_id → title → reason)."""
+    return {
+        "format": {
+            "type": "json_schema",
+            "name": "movie_pick",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "movie_id": {"type": "integer", "enum": list(candidate_ids)},
+                    "title": {"type": "string"},
+                    "reason": {"type": "string"},
+                },
+                "required": ["movie_id", "title", "reason"],
+                "additionalProperties": False,
+            },
+        }
+    }
+
+
+def build_pick_prompt(
+    situation: str,
+    mood_label: str,
+    candidates: List[Dict[str, Any]],
+    language: str,
+    token_budget: Optional[int] = None,
+) -> PickPrompt:
+    budget = DEFAULT_TOKEN_BUDGET if token_budget is None else token_budget
+
+    packed = []
+    overviews = []
+    for m in candidates:
+        packed.append(
+            {
+                "id": m.get("id"),
+                "title": m.get("title") or m.get("name"),
+                "rating": m.get("vote_average"),
+                "votes": m.get("vote_count"),
+                "year": (m.get("release_date") or "")[:4] or None,
+                "overview": "",
+            }
+        )
+        overviews.append((m.get("overview") or "").strip())
+
+    def render() -> str:
+        # 자주 바뀌는 값일수록 뒤로(candidates → mood → language → situation)
+        return _compact({"candidates": packed, "mood": mood_label, "language": language, "situation": situation})
+
+    overhead = count_tokens(SYSTEM_PROMPT) + count_tokens(render())
+    lengths = [count_tokens(ov) for ov in overviews]
+    for p, ov, n, alloc in zip(packed, overviews, lengths, _water_fill(lengths, budget - overhead)):
+        p["overview"] = _truncate(ov, alloc, n)
+
+    user = render()
+    total = count_tokens(SYSTEM_PROMPT) + count_tokens(user)
+    return PickPrompt(SYSTEM_PROMPT, user, total, sum(count_tokens(p["overview"]) for p in packed))
+
+
+def usage_report(prompt: PickPrompt, usage: Any = None) -> Dict[str, Any]:
+    """요청당 토큰 보고: 보내기 전 추정치 + (있으면) API가 알려준 실제 사용량."""
+    report: Dict[str, Any] = {"prompt_tokens_est": prompt.tokens, "overview_tokens_est": prompt.overview_tokens}
+    if usage is not None:
+        details = getattr(usage, "input_tokens_details", None)
+        report.update(
+            input_tokens=getattr(usage, "input_tokens", None),
+            cached_tokens=getattr(details, "cached_tokens", None),
+            output_tokens=getattr(usage, "output_tokens", None),
+        )
+    return report
@@ -0,0 +1,140 @@
+"""
+네트워크 없이 도는 로컬 의미 랭킹(해싱 벡터 + 코사인 유사도).
+
+줄거리와 상황 텍스트를 문자 2~3-gram으로 해싱(형태소 분석기 없이도 한국어/영어 모두 동작)해
+희소 벡터로 만들고, 후보 전체를 한 번의 배치 연산으로 점수화한다.
+영화 벡터는 (movie_id, 줄거리)별로 프로세스 전체에서 캐시.
+"""
+import math
+import re
+import threading
+import zlib
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from reco.mood import MOOD_KEYWORDS
+
+N_FEATURES = 1 << 16
+NGRAM_RANGE = (2, 3)
+# 유사도가 비슷할 때 평점으로 살짝 가르는 정도
+RATING_PRIOR_WEIGHT = 0.05
+
+# 무드별로 줄거리에 자주 나오는 단어(ko/en)로 상황 텍스트를 보강
+MOOD_EXPANSIONS = {
+    "힐링/잔잔": "가족 우정 일상 성장 치유 마을 따뜻한 family friendship everyday healing heartwarming gentle",
+    "감성/여운": "사랑 연인 첫사랑 이별 추억 운명 love romance relationship heartbreak memories fall in love",
+    "통쾌/에너지": "복수 싸움 범죄 조직 작전 액션 revenge fight mission battle criminal explosive",
+    "현실도피/판타지": "우주 마법 세계 모험 미래 행성 왕국 space magic world adventure future planet kingdom",
+    "웃음/가벼움": "코미디 유쾌 소동 엉뚱 좌충우돌 comedy hilarious funny misadventure chaos",
+    "긴장/스릴": "추격 위기 생존 비밀 음모 살인 chase survive secret conspiracy danger deadly",
+}
+
+_CLEAN = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+SparseVec = Tuple[np.ndarray, np.ndarray]  # (indices int32, values float32), L2 정규화됨
+
+
+def _features(text: str) -> Counter:
+    t = _SPACES.sub(" ", _CLEAN.sub(" ", (text or "").lower())).strip()
+    feats: Counter = Counter()
+    for word in t.split(" "):
+        if not word:
+            continue
+        w = f" {word} "
+        for n in range(NGRAM_RANGE[0], NGRAM_RANGE[1] + 1):
+            for i in range(len(w) - n + 1):
+                feats[w[i:i + n]] += 1
+    return feats
+
+
+def vectorize(text: str) -> SparseVec:
+    """서브리니어 TF + 부호 해싱(crc32: 프로세스가 달라도 결과가 같음) + L2 정규화."""
+    acc: Dict[int, float] = {}
+    for gram, tf in _features(text).items():
+        h = zlib.crc32(gram.encode("utf-8"))
+        idx = h % N_FEATURES
+        sign = 1.0 if (h >> 31) & 1 else -1.0
+        acc[idx] = acc.get(idx, 0.0) + sign * (1.0 + math.log(tf))
+    if not acc:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    indices = np.fromiter(acc.keys(), dtype=np.int32, count=len(acc))
+    values = np.fromiter(acc.values(), dtype=np.float32, count=len(acc))
+    norm = float(np.linalg.norm(values))
+    return indices, values / norm if norm else values
+
+
+class VectorCache:
+    def __init__(self, maxsize: int = 20000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[Any, int], SparseVec]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, movie_id: Any, text: str) -> SparseVec:
+        key = (movie_id, zlib.crc32(text.encode("utf-8")))
+        with self._lock:
+            vec = self._data.get(key)
+            if vec is not None:
+                self._data.move_to_end(key)
+                return vec
+        vec = vectorize(text)
+        with self._lock:
+            self._data[key] = vec
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return vec
+
+
+VECTOR_CACHE = VectorCache()
+
+
+def _movie_text(m: Dict[str, Any]) -> str:
+    return f"{m.get('title') or ''} {m.get('overview') or ''}"
+
+
+def query_text(situation: str, mood_label: str) -> str:
+    keywords = " ".join(MOOD_KEYWORDS.get(mood_label, {}))
+    return f"{situation or ''} {mood_label} {keywords} {MOOD_EXPANSIONS.get(mood_label, '')}"
+
+
+def score_candidates(situation: str, mood_label: str, candidates: List[Dict[str, Any]]) -> np.ndarray:
+    """후보별 (코사인 유사도 + 평점 prior) 점수. 모든 후보를 희소 행렬 하나로 묶어 한 번에 계산."""
+    if not candidates:
+        return np.zeros(0, dtype=np.float32)
+    q_idx, q_val = vectorize(query_text(situation, mood_label))
+    q = np.zeros(N_FEATURES, dtype=np.float32)
+    q[q_idx] = q_val
+
+    vecs = [VECTOR_CACHE.get(m.get("id"), _movie_text(m)) for m in candidates]
+    rows = np.repeat(np.arange(len(vecs)), [len(v[0]) for v in vecs])
+    indices = np.concatenate([v[0] for v in vecs])
+    values = np.concatenate([v[1] for v in vecs])
+    cosine = np.bincount(rows, weights=values * q[indices], minlength=len(vecs))
+
+    ratings = np.array([float(m.get("vote_average") or 0.0) for m in candidates])
+    return cosine + RATING_PRIOR_WEIGHT * (ratings / 10.0)
+
+
+def rank_candidates(
+    situation: str,
+    mood_label: str,
+    candidates: List[Dict[str, Any]],
+    top_k: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """점수 내림차순(동점이면 원래 순서)으로 정렬하고, top_k가 있으면 거기까지 자름."""
+    scores = score_candidates(situation, mood_label, candidates)
+    order = sorted(range(len(candidates)), key=lambda i: (-scores[i], i))
+    ranked = [candidates[i] for i in order]
+    return ranked[:top_k] if top_k else ranked
+
+
+def local_pick(situation: str, mood_label: str, candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """LLM 없이 고르는 결정적(deterministic) 1편. 반환 형식은 llm_pick_one_movie와 같음."""
+    best = rank_candidates(situation, mood_label, candidates, top_k=1)[0]
+    return {
+        "movie_id": int(best["id"]),
+        "title": str(best.get("title") or best.get("name") or "제목 없음"),
+        "reason": f"지금 상황과 ‘{mood_label}’ 무드에 줄거리가 가장 가까운 작품을 평점과 함께 고려해 골랐어요.",
+    }
@@ -0,0 +1,63 @@
+"""
+후보가 화면에 뜨자마자 최종 추천(LLM)을 미리 시작해 두는 추측 실행.
+
+입력(상황/무드/후보/제외 목록/언어)의 fingerprint를 같이 보관하고, 버튼을 누른 시점의
+fingerprint와 같을 때만 결과를 쓴다. 달라졌으면 취소(아직 시작 전이면)하거나 결과를 버린다.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from reco.llm_cache import normalize_situation
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speculative-pick")
+
+# 추측 실행이 실제로 쓰였는지 보는 카운터(프로세스 전체)
+STATS = {"submitted": 0, "used": 0, "discarded": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        STATS[name] += 1
+
+
+def pick_fingerprint(
+    situation: str,
+    mood_label: str,
+    candidate_ids: Iterable[Any],
+    excluded_ids: Iterable[Any],
+    language: str,
+) -> Tuple:
+    return (
+        normalize_situation(situation),
+        mood_label,
+        tuple(sorted(int(i) for i in candidate_ids if i)),
+        tuple(sorted(int(i) for i in excluded_ids if i)),
+        language,
+    )
+
+
+class SpeculativePick:
+    def __init__(self, fingerprint: Tuple, future: Future):
+        self.fingerprint = fingerprint
+        self.future = future
+
+    def matches(self, fingerprint: Tuple) -> bool:
+        return self.fingerprint == fingerprint
+
+    def result(self) -> Dict[str, Any]:
+        """끝났으면 바로, 진행 중이면 끝날 때까지 기다려서 결과를 반환."""
+        value = self.future.result()
+        _count("used")
+        return value
+
+    def discard(self) -> None:
+        # 시작 전이면 취소, 이미 도는 중이면 결과만 버림(LLM 결과 캐시에는 남음)
+        self.future.cancel()
+        _count("discarded")
+
+
+def submit(fingerprint: Tuple, fn: Callable[..., Dict[str, Any]], *args, **kwargs) -> SpeculativePick:
+    _count("submitted")
+    return SpeculativePick(fingerprint, _EXECUTOR.submit(fn, *args, **kwargs))
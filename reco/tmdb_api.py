@@ -0,0 +1,51 @@
+"""
+TMDB 엔드포인트 래퍼(디스크 캐시 적용).
+
+스크립트(app.py)는 rerun마다 다시 실행되므로, 백그라운드 워머/갱신 스레드가
+안정적으로 참조할 수 있도록 모듈로 분리해 둔다.
+"""
+from typing import Any, Dict, Optional
+
+from reco.tmdb_cache import cached
+from reco.tmdb_client import get_tmdb_client
+
+# discover 결과 TTL(초). 만료 후에도 하루까지는 옛 값을 주고 백그라운드에서 갱신.
+DISCOVER_TTL = 60 * 30
+
+
+def tmdb_get(api_key: str, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    # 프로세스 공유 클라이언트(커넥션 풀 + rate limit + 재시도)를 통해 호출
+    return get_tmdb_client().get(api_key, path, params)
+
+
+# 캐시 키에서 api_key는 제외(reco.tmdb_cache.cached) → 사용자/워커/재시작과 무관하게 공유
+@cached("discover", ttl=DISCOVER_TTL, stale_while_revalidate=True)
+def discover_movies_cached(
+    api_key: str,
+    with_genres: str,
+    language: str,
+    region: str,
+    min_vote_count: int,
+    min_rating: float,
+    page: int,
+) -> Dict[str, Any]:
+    return tmdb_get(
+        api_key,
+        "/discover/movie",
+        params={
+            "with_genres": with_genres,
+            "language": language,
+            "region": region,
+            "sort_by": "popularity.desc",
+            "include_adult": "false",
+            "vote_count.gte": min_vote_count,
+            "vote_average.gte": min_rating,
+            "page": page,
+        },
+    )
+
+
+# 상세 + 예고편을 한 번의 호출로 (append_to_response=videos → 응답의 "videos" 필드)
+@cached("movie_details_videos", ttl=60 * 60)
+def movie_details_cached(api_key: str, movie_id: int, language: str) -> Dict[str, Any]:
+    return tmdb_get(api_key, f"/movie/{movie_id}", params={"language": language, "append_to_response": "videos"})
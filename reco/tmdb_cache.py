@@ -0,0 +1,289 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional, Tuple, Union
+
+from reco.perf_metrics import CACHE_REQUESTS, Span, span
+
+# 여러 Streamlit 워커 프로세스가 같이 쓰는 디스크 캐시(SQLite, WAL 모드)
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "tmdb_cache.sqlite3")
+
+# 키 포맷이 바뀌면 올려서 예전 엔트리를 자연스럽게 무시
+KEY_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key         TEXT PRIMARY KEY,
+    value       BLOB NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    expires_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at);
+"""
+
+
+def make_key(namespace: str, args: Any) -> str:
+    raw = json.dumps([KEY_VERSION, namespace, args], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# =========================
+# SQLite Cache
+# =========================
+class SQLiteCache:
+    """
+    프로세스 간 공유되는 TTL + 용량 제한 LRU 캐시.
+    - 값은 JSON → zlib 압축해 저장
+    - 연결은 스레드별로 하나씩(sqlite3 연결은 스레드 간 공유 불가)
+    - 캐시 오류(잠금/디스크 문제 등)는 miss로 취급하고 본 요청은 계속 진행
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_bytes: int = 256 * 1024 * 1024,
+        compress_level: int = 6,
+        touch_interval: float = 60.0,
+        evict_every: int = 64,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.touch_interval = touch_interval  # LRU 갱신용 accessed_at 쓰기를 이 간격으로 제한
+        self.evict_every = evict_every
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+        self.evict()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[Any]:
+        entry = self.get_entry(key)
+        if entry is None or (entry[1] <= time.time() and not allow_stale):
+            return None
+        return entry[0]
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """만료 여부와 상관없이 (값, expires_at). 없으면 None."""
+        now = time.time()
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value, expires_at, accessed_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at, accessed_at = row
+            if now - accessed_at >= self.touch_interval:
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(zlib.decompress(value)), expires_at
+        except (sqlite3.Error, zlib.error, ValueError):
+            return None
+
+    def expires_at(self, key: str) -> Optional[float]:
+        try:
+            row = self._conn().execute("SELECT expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        blob = zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"), self.compress_level)
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now + ttl, now),
+            )
+        except sqlite3.Error:
+            return
+
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % self.evict_every == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> None:
+        """용량이 max_bytes를 넘으면 만료된 것 → 오래 안 쓴 것 순으로 90%까지 줄임."""
+        try:
+            conn = self._conn()
+            (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+            if total <= self.max_bytes:
+                return
+            target = int(self.max_bytes * 0.9)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+                (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+                victims = []
+                for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                    if total <= target:
+                        break
+                    victims.append((key,))
+                    total -= size
+                conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            return
+
+    def clear(self) -> None:
+        try:
+            self._conn().execute("DELETE FROM entries")
+        except sqlite3.Error:
+            return
+
+
+class NullCache:
+    """SQLite 캐시를 열 수 없을 때 쓰는 통과용 캐시(항상 miss, 쓰기는 버림)."""
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[Any]:
+        return None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        return None
+
+    def expires_at(self, key: str) -> Optional[float]:
+        return None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        pass
+
+    def evict(self) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+# =========================
+# Process-wide singleton + decorator
+# =========================
+_cache: Optional[Union[SQLiteCache, NullCache]] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Union[SQLiteCache, NullCache]:
+    """
+    환경변수로 조정: TMDB_CACHE_PATH(SQLite 파일 경로), TMDB_CACHE_MAX_MB(최대 용량)
+    경로를 만들거나 열 수 없으면(권한/읽기 전용 디스크 등) 캐시 없이 TMDB를 바로 호출.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = SQLiteCache(
+                        path=os.environ.get("TMDB_CACHE_PATH") or DEFAULT_CACHE_PATH,
+                        max_bytes=int(float(os.environ.get("TMDB_CACHE_MAX_MB", 256)) * 1024 * 1024),
+                    )
+                except (OSError, sqlite3.Error):
+                    _cache = NullCache()
+    return _cache
+
+
+# stale-while-revalidate 백그라운드 갱신용
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def cached(
+    namespace: str,
+    ttl: float,
+    exclude: Iterable[str] = ("api_key",),
+    stale_while_revalidate: bool = False,
+    max_stale: float = 24 * 60 * 60,
+) -> Callable:
+    """
+    st.cache_data 대신 쓰는 디스크 캐시 데코레이터.
+    exclude에 든 인자(기본: api_key)는 키에서 빼서, 키가 달라도 같은 공개 데이터를 공유.
+    stale_while_revalidate면 만료 후 max_stale 이내의 값은 바로 돌려주고 갱신은 백그라운드로.
+    감싼 함수에는 .refresh(...)(강제 갱신), .ttl_remaining(...)(남은 TTL, 없으면 None)이 붙음.
+    """
+    exclude = frozenset(exclude)
+
+    def decorator(fn: Callable) -> Callable:
+        sig = inspect.signature(fn)
+
+        def key_for(args, kwargs) -> str:
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return make_key(namespace, {k: v for k, v in bound.arguments.items() if k not in exclude})
+
+        def refresh(*args, **kwargs):
+            value = fn(*args, **kwargs)
+            get_cache().set(key_for(args, kwargs), value, ttl)
+            return value
+
+        def refresh_in_background(key: str, args, kwargs) -> None:
+            with _refreshing_lock:
+                if key in _refreshing:
+                    return
+                _refreshing.add(key)
+
+            def run():
+                try:
+                    refresh(*args, **kwargs)
+                except Exception:
+                    pass  # 다음 요청 때 다시 시도
+                finally:
+                    with _refreshing_lock:
+                        _refreshing.discard(key)
+
+            _refresh_executor.submit(run)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(f"tmdb.{namespace}") as s:
+                key = key_for(args, kwargs)
+                entry = get_cache().get_entry(key)
+                if entry is not None:
+                    value, expires_at = entry
+                    now = time.time()
+                    if expires_at > now:
+                        return _outcome(s, "hit", value)
+                    if stale_while_revalidate and now - expires_at <= max_stale:
+                        refresh_in_background(key, args, kwargs)
+                        return _outcome(s, "stale", value)
+                return _outcome(s, "miss", refresh(*args, **kwargs))
+
+        def _outcome(s: Span, outcome: str, value: Any) -> Any:
+            s.set(cache=outcome)
+            CACHE_REQUESTS.inc(namespace=namespace, outcome=outcome)
+            return value
+
+        def ttl_remaining(*args, **kwargs) -> Optional[float]:
+            expires_at = get_cache().expires_at(key_for(args, kwargs))
+            return None if expires_at is None else expires_at - time.time()
+
+        wrapper.refresh = refresh
+        wrapper.ttl_remaining = ttl_remaining
+        return wrapper
+
+    return decorator
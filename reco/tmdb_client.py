@@ -0,0 +1,189 @@
+import email.utils
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from reco.perf_metrics import HTTP_BYTES, HTTP_REQUESTS, HTTP_SECONDS, annotate, span
+
+TMDB_BASE = "https://api.themoviedb.org/3"
+
+# 재시도 대상 HTTP 상태 코드(429 + 일시적인 5xx)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# =========================
+# Token Bucket (rate limit)
+# =========================
+class TokenBucket:
+    """초당 rate개씩 토큰이 차고 최대 capacity개까지 쌓이는 스레드 안전 토큰 버킷."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        # acquire는 한 번에 토큰 1개가 필요하므로 capacity < 1이면 영원히 못 채움
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """토큰을 얻을 때까지 대기하고, 실제로 기다린 시간(초)을 반환."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+# =========================
+# TMDB Client
+# =========================
+class TMDBClient:
+    """
+    커넥션 풀(keep-alive)을 쓰는 TMDB GET 클라이언트.
+    - 모든 호출은 공유 토큰 버킷을 통과(TMDB rate limit 대응)
+    - 429/5xx/네트워크 오류는 지터가 섞인 지수 백오프로 재시도(Retry-After 우선)
+    """
+
+    def __init__(
+        self,
+        base_url: str = TMDB_BASE,
+        rate_per_sec: float = 40.0,
+        burst: float = 20.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        timeout: float = 20.0,
+        pool_size: int = 32,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.limiter = TokenBucket(rate_per_sec, burst)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, api_key: str, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        endpoint = re.sub(r"/\d+", "/{id}", path)
+        started = time.perf_counter()
+        try:
+            with span("http", endpoint=endpoint):
+                return self._get(api_key, path, endpoint, params)
+        finally:
+            # span 히스토그램은 이름별이라 엔드포인트별 지연은 따로(프로세스 전체, 실패 포함)
+            HTTP_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint)
+
+    def _get(self, api_key: str, path: str, endpoint: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        params = dict(params or {})
+        params["api_key"] = api_key
+        url = f"{self.base_url}{path}"
+
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                r = self.session.get(url, params=params, timeout=self.timeout)
+                HTTP_REQUESTS.inc(endpoint=endpoint, status=r.status_code)
+            except (requests.ConnectionError, requests.Timeout):
+                HTTP_REQUESTS.inc(endpoint=endpoint, status="error")
+                if attempt >= self.max_retries:
+                    annotate(retries=attempt or None)
+                    raise
+                time.sleep(self._backoff(attempt, None))
+                attempt += 1
+                continue
+
+            if r.status_code in RETRY_STATUS and attempt < self.max_retries:
+                delay = self._backoff(attempt, r.headers.get("Retry-After"))
+                if delay is not None:
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+
+            HTTP_BYTES.inc(len(r.content), endpoint=endpoint)
+            annotate(status=r.status_code, bytes=len(r.content), retries=attempt or None)
+            r.raise_for_status()
+            return r.json()
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> Optional[float]:
+        """
+        다음 재시도까지 기다릴 시간(초). 서버가 backoff_max보다 오래 기다리라고 하면 None
+        (화면 요청이 몇 분씩 멈추지 않도록 재시도하지 않고 바로 실패).
+        """
+        # full jitter: [0, min(cap, base * 2^attempt)]
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        wait = _parse_retry_after(retry_after)
+        if wait is not None:
+            if wait > self.backoff_max:
+                return None
+            # 서버가 알려준 시간은 반드시 지키고, 동시에 깨어나지 않도록 약간의 지터만 더함
+            return wait + random.uniform(0, self.backoff_base)
+        return delay
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        dt = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, dt.timestamp() - time.time())
+
+
+# =========================
+# Process-wide singleton
+# =========================
+_client: Optional[TMDBClient] = None
+_client_lock = threading.Lock()
+
+
+def get_tmdb_client() -> TMDBClient:
+    """
+    프로세스 전체에서 하나만 쓰는 TMDB 클라이언트.
+    (Streamlit은 매 rerun마다 app.py를 다시 실행하므로 모듈 전역으로 유지)
+    환경변수로 조정: TMDB_RATE_LIMIT(초당 요청 수), TMDB_RATE_BURST, TMDB_MAX_RETRIES, TMDB_TIMEOUT,
+    TMDB_BASE_URL(로컬 가짜 서버 등으로 바꿀 때, bench/)
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = TMDBClient(
+                    base_url=os.environ.get("TMDB_BASE_URL") or TMDB_BASE,
+                    rate_per_sec=_env_float("TMDB_RATE_LIMIT", 40.0),
+                    burst=_env_float("TMDB_RATE_BURST", 20.0),
+                    max_retries=int(_env_float("TMDB_MAX_RETRIES", 3)),
+                    timeout=_env_float("TMDB_TIMEOUT", 20.0),
+                )
+    return _client
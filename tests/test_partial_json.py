@@ -0,0 +1,36 @@
+import json
+
+from reco.partial_json import PartialPickParser, _partial_string
+
+FULL = json.dumps({"movie_id": 42, "title": "웃음 😀 여행", "reason": "줄바꿈\n과 \"따옴표\" 😀"})  # ensure_ascii → \uXXXX
+
+
+def test_prefixes_never_contain_lone_surrogates():
+    # 스트리밍 중 어느 지점에서 끊겨도 화면에 쓸 수 있는 문자열이어야 함
+    expected = json.loads(FULL)
+    parser = PartialPickParser()
+    for ch in FULL:
+        state = parser.feed(ch)
+        for name in ("title", "reason"):
+            if state[name] is not None:
+                state[name].encode("utf-8")  # 짝 없는 서로게이트면 UnicodeEncodeError
+                assert expected[name].startswith(state[name])
+    assert state == expected
+
+
+def test_surrogate_pair_is_held_back_until_complete():
+    assert _partial_string('a\\ud83d', 0) == "a"
+    assert _partial_string('a\\ud83d\\ude', 0) == "a"
+    assert _partial_string('a\\ud83d\\ude00b"', 0) == "a😀b"
+
+
+def test_unpaired_surrogates_become_replacement_char():
+    assert _partial_string('\\ud83dx"', 0) == "�x"
+    assert _partial_string('\\ude00x"', 0) == "�x"
+
+
+def test_movie_id_and_incomplete_escape():
+    parser = PartialPickParser()
+    assert parser.feed('{"movie_id": 7') == {"movie_id": None, "title": None, "reason": None}
+    assert parser.feed(', "title": "A\\') == {"movie_id": 7, "title": "A", "reason": None}
+    assert parser.feed('n"')["title"] == "A\n"